@@ -11,7 +11,6 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
 from pathlib import Path
-from google.oauth2 import service_account
 import os
 
 
@@ -113,6 +112,11 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Learner sign-in (django.contrib.auth.urls under /accounts/)
+LOGIN_URL = "login"
+LOGIN_REDIRECT_URL = "library"
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/4.2/topics/i18n/
 
@@ -140,20 +144,65 @@ MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / 'media'
 
 
-DEFAULT_FILE_STORAGE = "storages.backends.gcloud.GoogleCloudStorage"
+DEFAULT_FILE_STORAGE = "input_app.storage_backends.LazyGoogleCloudStorage"
 GS_BUCKET_NAME = "llprojectbucket"
-GS_CREDENTIALS = service_account.Credentials.from_service_account_file(
-    BASE_DIR / "credentials" / "gcs-service-account.json"
-)
+# Read on first storage access (input_app.gcs_utils.gcs_credentials), not at import:
+# manage.py commands, worker boot and offline tests don't need the key.
+GS_CREDENTIALS_FILE = BASE_DIR / "credentials" / "gcs-service-account.json"
 
 WORKER_API_TOKEN = "super-secret-token"  # later: move to env var
 
+# Playback rendition built after transcription (see input_app.services.build_playback_files)
+PLAYBACK_BITRATE = "48k"        # mono AAC, ~21 MB/hour instead of 115 MB/hour of WAV
+PLAYBACK_SEGMENT_SEC = 6        # HLS segment length
+PLAYBACK_PRECUT_CLIPS = True    # also cut one clip per transcript cue for sentence replay
+PLAYBACK_URL_MINUTES = 60       # lifetime of signed URLs handed to the player
+
+# Transcript exports stored gzip (and brotli, if installed) compressed after transcription
+EXPORT_PRECOMPRESSED_FORMATS = ["srt", "vtt", "txt", "json"]
+
 
 # Celery broker/result (Redis local)
 CELERY_BROKER_URL = "redis://127.0.0.1:6379/0"
 CELERY_RESULT_BACKEND = "redis://127.0.0.1:6379/0"
 CELERY_TASK_ALWAYS_EAGER = False  # True runs tasks inline (for quick debugging)
 
+# Job progress timeline (input_app.events): batched inserts + hourly compaction
+JOB_EVENT_BATCH_SIZE = 50       # flush after this many buffered events…
+JOB_EVENT_FLUSH_SEC = 2.0       # …or once the oldest buffered event is this old
+JOB_EVENT_RETENTION_DAYS = 7    # raw events older than this are rolled into summaries
+
+# Admission control on /submit (input_app.admission), enforced atomically in Redis
+ADMISSION_REDIS_URL = CELERY_BROKER_URL
+ADMISSION_QUEUE_KEY = "celery"           # broker list holding queued Celery tasks
+ADMISSION_MAX_QUEUE_DEPTH = 200          # above this, new jobs wait in the waiting room
+ADMISSION_QUEUE_RETRY_SEC = 30           # Retry-After when the queue is full
+ADMISSION_GLOBAL_RATE = 0.5              # jobs/s admitted across all web processes…
+ADMISSION_GLOBAL_BURST = 20              # …with this much burst
+ADMISSION_OWNER_RATE = 1 / 60            # per user / client IP: one job a minute…
+ADMISSION_OWNER_BURST = 5                # …after an initial burst of five
+ADMISSION_MAX_WAITING = 500              # waiting room size; beyond it submissions get 503
+# Key anonymous owners on Cloudflare's CF-Connecting-IP instead of REMOTE_ADDR.
+# Only enable when the app is reachable solely through the tunnel: otherwise
+# a client can send a fresh header per request and dodge the per-owner limit.
+ADMISSION_TRUST_CF_HEADER = False
+
+CELERY_BEAT_SCHEDULE = {
+    "compact-job-events": {"task": "input_app.tasks.compact_job_events", "schedule": 60 * 60},
+    "admit-waiting-jobs": {"task": "input_app.tasks.admit_waiting_jobs", "schedule": 10},
+    "storage-lifecycle": {"task": "input_app.tasks.apply_storage_lifecycle", "schedule": 6 * 60 * 60},
+}
+
+# Storage lifecycle (input_app.lifecycle): which intermediate artifacts to purge, and when.
+# Transcripts are kept. Preview with: python manage.py storage_lifecycle --dry-run
+STORAGE_LIFECYCLE_POLICIES = [
+    # the player falls back to the WAV until the HLS rendition exists
+    {"artifact": "wav_audio", "status": "ready", "after_days": 7, "requires": "playback"},
+    # {"artifact": "source_audio", "status": "ready", "after_days": 30},
+    {"artifact": "wav_audio", "status": "failed", "after_days": 7},
+    {"artifact": "source_audio", "status": "failed", "after_days": 7},
+]
+
 # Optional: JSON serializer (safe defaults)
 CELERY_TASK_SERIALIZER = "json"
 CELERY_ACCEPT_CONTENT = ["json"]
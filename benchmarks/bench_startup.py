@@ -0,0 +1,61 @@
+"""
+Cold-start time of the processes we autoscale: the web app, the Celery worker
+and a plain `manage.py check`.
+
+Each scenario runs in a fresh interpreter (so nothing is cached in-process)
+several times; the median wall time is reported.
+
+    python benchmarks/bench_startup.py            # 7 runs per scenario
+    python benchmarks/bench_startup.py -n 15 --settings LLWA.settings
+
+"web" loads Django, the WSGI app and the URLconf (i.e. every view module),
+"worker" loads the Celery app and imports every task module the way
+`celery worker` does at boot. Neither touches the network.
+
+Only the standard library is used.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+SCENARIOS = {
+    "web": [sys.executable, "-c",
+            "import LLWA.wsgi; from django.urls import get_resolver; get_resolver().url_patterns"],
+    "worker": [sys.executable, "-c",
+               "import django; django.setup(); from LLWA.celery import app; "
+               "app.loader.import_default_modules()"],
+    "manage.py check": [sys.executable, "manage.py", "check"],
+}
+
+
+def time_once(cmd, env):
+    t0 = time.perf_counter()
+    proc = subprocess.run(cmd, cwd=ROOT, env=env, capture_output=True, text=True)
+    elapsed = time.perf_counter() - t0
+    if proc.returncode != 0:
+        raise SystemExit(f"{' '.join(cmd)} failed:\n{proc.stderr.strip()}")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", "--runs", type=int, default=7)
+    parser.add_argument("--settings", default=os.environ.get("DJANGO_SETTINGS_MODULE", "LLWA.settings"))
+    args = parser.parse_args()
+
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=args.settings)
+    for name, cmd in SCENARIOS.items():
+        time_once(cmd, env)  # warm the OS page cache / .pyc files
+        runs = sorted(time_once(cmd, env) for _ in range(args.runs))
+        print(f"{name:<16} median={statistics.median(runs) * 1000:7.1f}ms  "
+              f"min={runs[0] * 1000:7.1f}ms  max={runs[-1] * 1000:7.1f}ms  (n={args.runs})")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,62 @@
 from django.contrib import admin
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import ChangeList
 from .models import TranscriptionJob
+from .pagination import CURSOR_VAR, keyset_page
+from .tasks import RERUNNABLE_STATUSES, prepare_audio
 # Register your models here.
 
-admin.site.register(TranscriptionJob)
+
+class KeysetChangeList(ChangeList):
+    """Changelist paged by (created_at, id) cursor instead of OFFSET + COUNT(*)."""
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(CURSOR_VAR, None)  # not a field lookup
+        return lookup_params
+
+    def get_results(self, request):
+        cursor = request.GET.get(CURSOR_VAR)
+        try:
+            rows, next_cursor = keyset_page(self.queryset.only(*self.model_admin.list_only),
+                                            cursor, self.list_per_page)
+        except ValueError:
+            raise IncorrectLookupParameters
+        self.result_list = rows
+        self.result_count = len(rows)
+        self.full_result_count = None
+        self.show_full_result_count = False
+        self.show_admin_actions = True
+        self.can_show_all = False
+        self.multi_page = bool(cursor or next_cursor)
+        self.paginator = None
+        # links for the pagination block in the change_list.html override
+        self.first_page_url = self.get_query_string(remove=[CURSOR_VAR]) if cursor else None
+        self.next_page_url = self.get_query_string({CURSOR_VAR: next_cursor}) if next_cursor else None
+
+
+@admin.register(TranscriptionJob)
+class TranscriptionJobAdmin(admin.ModelAdmin):
+    list_display = ("title", "status", "owner", "language", "segment_count", "duration_sec", "created_at")
+    list_filter = ("status",)
+    list_select_related = ("owner",)
+    ordering = ("-created_at", "-id")
+    sortable_by = ()                 # keyset paging is tied to the (created_at, id) order
+    show_full_result_count = False
+    actions = ["rerun_preparation"]
+
+    # changelist loads only these columns: no URLs, FileField names, error text, checkpoints…
+    list_only = ("id", "job_uuid", "title", "status", "language", "segment_count", "duration_sec",
+                 "created_at", "owner__username")
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
+
+    @admin.action(description="Re-run audio preparation of failed / unfinished jobs (resumes from checkpoints)")
+    def rerun_preparation(self, request, queryset):
+        job_ids = list(queryset.filter(status__in=RERUNNABLE_STATUSES).values_list("pk", flat=True))
+        for job_id in job_ids:
+            prepare_audio.delay(job_id)
+        skipped = queryset.count() - len(job_ids)
+        self.message_user(request, f"Queued {len(job_ids)} job(s)."
+                          + (f" Skipped {skipped} already past preparation." if skipped else ""))
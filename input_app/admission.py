@@ -0,0 +1,91 @@
+import math
+from typing import NamedTuple
+import redis
+from django.conf import settings
+
+# Admission control for job submission.
+#
+# Token buckets live in Redis and are checked + charged by one Lua script,
+# so the limits hold across every web process. The same script also looks at
+# the Celery queue length (the broker's list) to push back before the
+# download tier is swamped.
+
+_TAKE_TOKENS = """
+-- KEYS[1]   : celery queue list (depth check), KEYS[2..] : bucket hashes
+-- ARGV[1]   : max queue depth (0 = don't check)
+-- ARGV[2i-2], ARGV[2i-1] : rate (tokens/s) and burst for KEYS[i]
+-- returns {admitted, wait_seconds (string, -1 = queue full), queue_depth}
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local depth = redis.call('LLEN', KEYS[1])
+local max_depth = tonumber(ARGV[1])
+if max_depth > 0 and depth >= max_depth then
+  return {0, '-1', depth}
+end
+local tokens = {}
+for i = 2, #KEYS do
+  local rate, burst = tonumber(ARGV[2 * i - 2]), tonumber(ARGV[2 * i - 1])
+  local state = redis.call('HMGET', KEYS[i], 'tokens', 'ts')
+  local level = tonumber(state[1]) or burst
+  local ts = tonumber(state[2]) or now
+  level = math.min(burst, level + math.max(0, now - ts) * rate)
+  if level < 1 then
+    return {0, tostring((1 - level) / rate), depth}
+  end
+  tokens[i] = level
+end
+for i = 2, #KEYS do
+  local rate, burst = tonumber(ARGV[2 * i - 2]), tonumber(ARGV[2 * i - 1])
+  redis.call('HSET', KEYS[i], 'tokens', tostring(tokens[i] - 1), 'ts', tostring(now))
+  redis.call('EXPIRE', KEYS[i], math.ceil(burst / rate) + 60)
+end
+return {1, '0', depth}
+"""
+
+
+class Decision(NamedTuple):
+    admitted: bool
+    retry_after: int    # seconds, for the Retry-After header (0 when admitted)
+    queue_depth: int
+
+
+_script = None
+
+def _take_tokens():
+    global _script
+    if _script is None:
+        client = redis.Redis.from_url(settings.ADMISSION_REDIS_URL)
+        _script = client.register_script(_TAKE_TOKENS)
+    return _script
+
+def _take(buckets, *, check_queue: bool) -> Decision:
+    keys = [settings.ADMISSION_QUEUE_KEY] + [f"admission:{name}" for name, _, _ in buckets]
+    args = [settings.ADMISSION_MAX_QUEUE_DEPTH if check_queue else 0]
+    for _, rate, burst in buckets:
+        args += [rate, burst]
+    admitted, wait, depth = _take_tokens()(keys=keys, args=args)
+    wait = float(wait)
+    if admitted:
+        return Decision(True, 0, depth)
+    retry_after = settings.ADMISSION_QUEUE_RETRY_SEC if wait < 0 else max(1, math.ceil(wait))
+    return Decision(False, retry_after, depth)
+
+def charge_owner(owner_key: str) -> Decision:
+    """Per-owner bucket: caps how fast one user / client IP may submit."""
+    return _take([(f"owner:{owner_key}", settings.ADMISSION_OWNER_RATE, settings.ADMISSION_OWNER_BURST)],
+                 check_queue=False)
+
+def admit_global() -> Decision:
+    """Global bucket + Celery queue depth: may a new job start processing now?"""
+    return _take([("global", settings.ADMISSION_GLOBAL_RATE, settings.ADMISSION_GLOBAL_BURST)],
+                 check_queue=True)
+
+def owner_key_for(request) -> str:
+    if request.user.is_authenticated:
+        return f"user:{request.user.pk}"
+    # behind the cloudflare tunnel REMOTE_ADDR is the tunnel, not the client; but the
+    # header is client-controlled, so only trust it when every request comes through it
+    ip = request.META.get("REMOTE_ADDR", "")
+    if settings.ADMISSION_TRUST_CF_HEADER:
+        ip = request.headers.get("CF-Connecting-IP") or ip
+    return f"ip:{ip}"
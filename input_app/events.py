@@ -0,0 +1,113 @@
+import threading
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Count, Max, Min, OuterRef, Subquery
+from django.utils.timezone import now
+from .models import JobEvent
+
+# ---- writing -------------------------------------------------------
+
+class EventBuffer:
+    """
+    Per-process buffer of JobEvent rows, written with one bulk INSERT once it
+    holds `max_size` events, the oldest one is `max_age` seconds old, or the
+    stage changes (so a long step such as ffmpeg shows up right away).
+    A timer enforces `max_age` while the caller is blocked in a long step
+    (upload, waveform peaks) and adds nothing.
+    """
+    def __init__(self, max_size: int, max_age: float):
+        self.max_size = max_size
+        self.max_age = max_age
+        self._events = []
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def add(self, event: JobEvent):
+        with self._lock:
+            stage_changed = bool(self._events) and self._events[-1].stage != event.stage
+            self._events.append(event)
+            due = stage_changed or len(self._events) >= self.max_size
+            if not due and self._timer is None:
+                self._timer = threading.Timer(self.max_age, self._flush_from_timer)
+                self._timer.daemon = True
+                self._timer.start()
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            events, self._events = self._events, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if events:
+            JobEvent.objects.bulk_create(events)
+
+    def _flush_from_timer(self):
+        try:
+            self.flush()
+        finally:
+            connections.close_all()  # this thread's connections only
+
+_buffer = EventBuffer(settings.JOB_EVENT_BATCH_SIZE, settings.JOB_EVENT_FLUSH_SEC)
+
+def _event(job_id: int, stage: str, percent: int, message: str) -> JobEvent:
+    return JobEvent(job_id=job_id, stage=stage, percent=int(max(0, min(100, percent or 0))),
+                    message=(message or "")[:255], ts=now())
+
+def record_event(job_id: int, stage: str, percent: int, message: str = "", *, buffered: bool = True):
+    """Append a progress event. Unbuffered writes flush the buffer first to keep order."""
+    event = _event(job_id, stage, percent, message)
+    if buffered:
+        _buffer.add(event)
+    else:
+        _buffer.flush()
+        event.save()
+
+async def arecord_event(job_id: int, stage: str, percent: int, message: str = ""):
+    await _event(job_id, stage, percent, message).asave()
+
+def flush_events():
+    _buffer.flush()
+
+# ---- reading -------------------------------------------------------
+
+def _latest(job_id: int):
+    return JobEvent.objects.filter(job_id=job_id).order_by("-ts")
+
+def latest_event(job_id: int):
+    return _latest(job_id).first()
+
+async def alatest_event(job_id: int):
+    return await _latest(job_id).afirst()
+
+# ---- compaction ----------------------------------------------------
+
+def compact_events(before, batch_jobs: int = 200) -> int:
+    """
+    Roll raw events older than `before` into one summary row per (job, stage),
+    a batch of jobs per transaction. Returns the number of raw events removed.
+    """
+    removed = 0
+    while True:
+        raw = JobEvent.objects.filter(ts__lt=before, first_ts__isnull=True)
+        job_ids = list(raw.values_list("job_id", flat=True).distinct()[:batch_jobs])
+        if not job_ids:
+            return removed
+        with transaction.atomic():
+            batch = raw.filter(job_id__in=job_ids)
+            # the summary keeps the stage's last message: it may be the job's latest
+            # event (shown on the status page), e.g. a failure's error text
+            last_message = Subquery(
+                batch.filter(job_id=OuterRef("job_id"), stage=OuterRef("stage"))
+                .order_by("-ts", "-id").values("message")[:1]
+            )
+            summaries = [
+                JobEvent(job_id=g["job_id"], stage=g["stage"], percent=g["top"], count=g["n"],
+                         first_ts=g["first"], ts=g["last"], message=g["last_message"])
+                for g in batch.values("job_id", "stage").annotate(
+                    n=Count("id"), first=Min("ts"), last=Max("ts"), top=Max("percent"),
+                    last_message=last_message)
+            ]
+            removed += batch.delete()[0]
+            JobEvent.objects.bulk_create(summaries)
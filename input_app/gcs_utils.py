@@ -1,23 +1,88 @@
 from datetime import timedelta
-from google.cloud import storage
+from functools import lru_cache
 from django.conf import settings
+from asgiref.sync import sync_to_async
 
+# Credentials and the client are built on first use and then reused by the
+# whole process (the client is thread-safe and keeps its HTTP connections).
+# Nothing is created at import time, so prefork Celery children each get
+# their own client and commands that never touch storage never load the key.
+
+@lru_cache(maxsize=None)
+def gcs_credentials():
+    from google.oauth2 import service_account
+    return service_account.Credentials.from_service_account_file(settings.GS_CREDENTIALS_FILE)
+
+@lru_cache(maxsize=None)
 def gcs_client():
-    return storage.Client(
-        credentials=settings.GS_CREDENTIALS,
-        project=settings.GS_CREDENTIALS.project_id,
-    )
+    from google.cloud import storage  # ~100 ms import, paid by the first storage call only
+    credentials = gcs_credentials()
+    return storage.Client(credentials=credentials, project=credentials.project_id)
 
 def signed_get_url(object_key, minutes=15):
     client = gcs_client()
     blob = client.bucket(settings.GS_BUCKET_NAME).blob(object_key)
     return blob.generate_signed_url(version="v4", expiration=timedelta(minutes=minutes), method="GET")
 
-def vtt_text(object_key):
+def object_text(object_key):
     client = gcs_client()
     blob = client.bucket(settings.GS_BUCKET_NAME).blob(object_key)
     return blob.download_as_text()
 
+def vtt_text(object_key):
+    return object_text(object_key)
+
+def open_object(object_key, mode="rt"):
+    """Streaming reader over a stored object (ranged reads, constant memory)."""
+    client = gcs_client()
+    blob = client.bucket(settings.GS_BUCKET_NAME).blob(object_key)
+    return blob.open(mode, chunk_size=256 * 1024)
+
+def upload_file(object_key, local_path, content_type, content_encoding=None, content_disposition=None):
+    client = gcs_client()
+    blob = client.bucket(settings.GS_BUCKET_NAME).blob(object_key)
+    blob.content_encoding = content_encoding
+    blob.content_disposition = content_disposition
+    blob.upload_from_filename(local_path, content_type=content_type)
+    return object_key
+
+def object_bytes(object_key, start=None, end=None):
+    # start/end are inclusive byte offsets (HTTP Range semantics)
+    client = gcs_client()
+    blob = client.bucket(settings.GS_BUCKET_NAME).blob(object_key)
+    return blob.download_as_bytes(start=start, end=end)
+
+def blob_info(object_key):
+    """(size, crc32c) of a stored object, or None if it doesn't exist."""
+    client = gcs_client()
+    blob = client.bucket(settings.GS_BUCKET_NAME).get_blob(object_key)
+    if blob is None:
+        return None
+    return blob.size, blob.crc32c
+
+def delete_objects(object_keys, batch_size=100):
+    """
+    Delete many objects with batched requests (GCS allows 100 calls per batch).
+    Returns the keys that are now gone: deleted, or already missing (404).
+    Anything else (403, 429, 5xx…) is left out so the caller can retry later.
+    """
+    client = gcs_client()
+    bucket = client.bucket(settings.GS_BUCKET_NAME)
+    keys = list(object_keys)
+    gone = []
+    for i in range(0, len(keys), batch_size):
+        chunk = keys[i:i + batch_size]
+        # a Batch is a connection that queues its requests; finish() sends them
+        # in one call and, with raise_exception=False, returns every
+        # sub-response in order instead of raising the last failure
+        batch = client.batch(raise_exception=False)
+        for key in chunk:
+            batch.api_request(method="DELETE", path=bucket.blob(key).path)
+        for key, response in zip(chunk, batch.finish(raise_exception=False)):
+            if 200 <= response.status_code < 300 or response.status_code == 404:
+                gone.append(key)
+    return gone
+
 def signed_put_url(object_key, content_type, minutes=15):
     client = gcs_client()
     blob = client.bucket(settings.GS_BUCKET_NAME).blob(object_key)
@@ -26,4 +91,25 @@ def signed_put_url(object_key, content_type, minutes=15):
         expiration=timedelta(minutes=minutes),
         method="PUT",
         content_type=content_type,  # MUST match the header the worker sends
-    )
\ No newline at end of file
+    )
+
+# ---- async variants ------------------------------------------------
+# thread_sensitive=False so several calls can be gathered and run in parallel
+# threads instead of queueing behind each other on the main sync thread.
+
+async def asigned_get_url(object_key, minutes=15):
+    return await sync_to_async(signed_get_url, thread_sensitive=False)(object_key, minutes=minutes)
+
+async def avtt_text(object_key):
+    return await sync_to_async(vtt_text, thread_sensitive=False)(object_key)
+
+async def aobject_text(object_key):
+    return await sync_to_async(object_text, thread_sensitive=False)(object_key)
+
+async def aobject_bytes(object_key, start=None, end=None):
+    return await sync_to_async(object_bytes, thread_sensitive=False)(object_key, start=start, end=end)
+
+async def asigned_put_url(object_key, content_type, minutes=15):
+    return await sync_to_async(signed_put_url, thread_sensitive=False)(
+        object_key, content_type, minutes=minutes
+    )
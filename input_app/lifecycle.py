@@ -0,0 +1,98 @@
+from datetime import timedelta
+from typing import NamedTuple, Optional
+from django.conf import settings
+from django.db.models import Q
+from django.utils.timezone import now
+from .models import TranscriptionJob
+from .gcs_utils import blob_info, delete_objects
+
+# Storage lifecycle: purge intermediate artifacts once a job has sat in a
+# given status long enough (e.g. the 16 kHz WAV 7 days after 'ready').
+# Policies come from settings.STORAGE_LIFECYCLE_POLICIES. Each policy targets
+# a single-object FileField; transcripts are never listed there.
+
+
+class Policy(NamedTuple):
+    artifact: str       # FileField name on TranscriptionJob, e.g. "wav_audio"
+    status: str         # only jobs in this status…
+    after: timedelta    # …whose row hasn't changed for this long
+    requires: Optional[str] = None  # checkpoint that must exist first, e.g. "playback"
+
+
+def configured_policies():
+    return [
+        Policy(p["artifact"], p["status"], timedelta(days=p["after_days"]), p.get("requires"))
+        for p in settings.STORAGE_LIFECYCLE_POLICIES
+    ]
+
+
+def _expired_pages(policy: Policy, cutoff, page_size: int):
+    """
+    Keyset pagination over the (status, updated_at) index: each page picks up
+    after the last (updated_at, id) seen, so cost per page stays flat.
+    """
+    qs = (TranscriptionJob.objects
+          .filter(status=policy.status, updated_at__lt=cutoff)
+          .exclude(**{policy.artifact: ""})
+          .order_by("updated_at", "id")
+          .only("id", "updated_at", "checkpoints", policy.artifact))
+    if policy.requires:
+        qs = qs.filter(checkpoints__has_key=policy.requires)
+    last = None
+    while True:
+        page = qs
+        if last is not None:
+            page = qs.filter(Q(updated_at__gt=last[0]) | Q(updated_at=last[0], id__gt=last[1]))
+        page = list(page[:page_size])
+        if not page:
+            return
+        yield page
+        last = (page[-1].updated_at, page[-1].id)
+
+
+def _stored_size(job, key: str) -> int:
+    # sizes were recorded by the pipeline checkpoints; only legacy rows need a lookup
+    for checkpoint in (job.checkpoints or {}).values():
+        if checkpoint.get("key") == key and "size" in checkpoint:
+            return checkpoint["size"]
+    info = blob_info(key)
+    return info[0] if info else 0
+
+
+def run_lifecycle(*, dry_run: bool = False, page_size: int = 500) -> dict:
+    """
+    Apply every policy. Returns a report per artifact:
+    {"wav_audio": {"jobs": n, "bytes": n, "failed": n}, ...}; with dry_run
+    nothing is deleted. Objects whose delete failed keep their FileField, so
+    the next run picks them up again.
+    """
+    started = now()
+    report = {}
+    for policy in configured_policies():
+        stats = report.setdefault(policy.artifact, {"jobs": 0, "bytes": 0, "failed": 0})
+        for page in _expired_pages(policy, started - policy.after, page_size):
+            # sizes first: legacy rows (no checkpoint) need the object to still exist
+            sizes = {job.id: _stored_size(job, getattr(job, policy.artifact).name) for job in page}
+            if not dry_run:
+                keys = {job.id: getattr(job, policy.artifact).name for job in page}
+                gone = set(delete_objects(list(keys.values())))
+                page = [job for job in page if keys[job.id] in gone]
+                stats["failed"] += len(keys) - len(page)
+                # bulk UPDATE doesn't bump updated_at, so the keyset position stays valid
+                TranscriptionJob.objects.filter(id__in=[job.id for job in page]).update(**{policy.artifact: ""})
+            stats["jobs"] += len(page)
+            stats["bytes"] += sum(sizes[job.id] for job in page)
+    return report
+
+
+def format_report(report: dict, dry_run: bool) -> str:
+    verb = "would reclaim" if dry_run else "reclaimed"
+    lines = []
+    for artifact, stats in report.items():
+        line = f"{artifact}: {stats['jobs']} object(s), {verb} {stats['bytes'] / 1024 ** 2:.1f} MB"
+        if stats.get("failed"):
+            line += f", {stats['failed']} delete(s) failed (kept for the next run)"
+        lines.append(line)
+    total = sum(stats["bytes"] for stats in report.values())
+    lines.append(f"total: {verb} {total / 1024 ** 2:.1f} MB")
+    return "\n".join(lines)
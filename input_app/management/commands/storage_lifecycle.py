@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from input_app.lifecycle import run_lifecycle, format_report
+
+
+class Command(BaseCommand):
+    help = "Purge intermediate audio per STORAGE_LIFECYCLE_POLICIES (use --dry-run for a report only)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="report bytes to reclaim, delete nothing")
+        parser.add_argument("--page-size", type=int, default=500)
+
+    def handle(self, *args, dry_run=False, page_size=500, **options):
+        report = run_lifecycle(dry_run=dry_run, page_size=page_size)
+        self.stdout.write(format_report(report, dry_run))
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.24 on 2026-10-19 12:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('input_app', '0003_transcriptionjob_message_transcriptionjob_percent_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transcriptionjob',
+            name='checkpoints',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.24 on 2026-10-19 12:36
+
+from django.db import migrations, models
+import input_app.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('input_app', '0004_transcriptionjob_checkpoints'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transcriptionjob',
+            name='clip_count',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='transcriptionjob',
+            name='playback_playlist',
+            field=models.FileField(blank=True, upload_to=input_app.models.job_dir),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.24 on 2026-10-19 12:38
+
+from django.db import migrations, models
+import input_app.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('input_app', '0005_transcriptionjob_playback'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transcriptionjob',
+            name='waveform_peaks',
+            field=models.FileField(blank=True, upload_to=input_app.models.job_dir),
+        ),
+    ]
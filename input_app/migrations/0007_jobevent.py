@@ -0,0 +1,30 @@
+# Generated by Django 4.2.24 on 2026-10-19 12:42
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('input_app', '0006_transcriptionjob_waveform_peaks'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('stage', models.CharField(choices=[('queued', 'Queued'), ('downloading', 'Downloading'), ('converting', 'Converting'), ('transcribing', 'Transcribing'), ('ready', 'Ready'), ('failed', 'Failed'), ('awaiting_transcription', 'Awaiting_transcription')], max_length=32)),
+                ('percent', models.PositiveSmallIntegerField(default=0)),
+                ('message', models.CharField(blank=True, max_length=300)),
+                ('ts', models.DateTimeField()),
+                ('count', models.PositiveIntegerField(default=1)),
+                ('first_ts', models.DateTimeField(blank=True, null=True)),
+                ('job', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='events', to='input_app.transcriptionjob')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['job', 'ts'], name='jobevent_job_ts_idx')],
+            },
+        ),
+    ]
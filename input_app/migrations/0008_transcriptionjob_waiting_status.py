@@ -0,0 +1,28 @@
+# Generated by Django 4.2.24 on 2026-10-19 12:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('input_app', '0007_jobevent'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='jobevent',
+            name='stage',
+            field=models.CharField(choices=[('queued', 'Queued'), ('downloading', 'Downloading'), ('converting', 'Converting'), ('transcribing', 'Transcribing'), ('ready', 'Ready'), ('failed', 'Failed'), ('awaiting_transcription', 'Awaiting_transcription'), ('waiting', 'Waiting')], max_length=32),
+        ),
+        migrations.AlterField(
+            model_name='transcriptionjob',
+            name='status',
+            field=models.CharField(choices=[('queued', 'Queued'), ('downloading', 'Downloading'), ('converting', 'Converting'), ('transcribing', 'Transcribing'), ('ready', 'Ready'), ('failed', 'Failed'), ('awaiting_transcription', 'Awaiting_transcription'), ('waiting', 'Waiting')], default='queued', max_length=32),
+        ),
+        migrations.AlterField(
+            model_name='transcriptionjob',
+            name='step',
+            field=models.CharField(choices=[('queued', 'Queued'), ('downloading', 'Downloading'), ('converting', 'Converting'), ('transcribing', 'Transcribing'), ('ready', 'Ready'), ('failed', 'Failed'), ('awaiting_transcription', 'Awaiting_transcription'), ('waiting', 'Waiting')], default='queued', max_length=32),
+        ),
+    ]
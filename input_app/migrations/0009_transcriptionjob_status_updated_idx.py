@@ -0,0 +1,17 @@
+# Generated by Django 4.2.24 on 2026-10-19 12:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('input_app', '0008_transcriptionjob_waiting_status'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transcriptionjob',
+            index=models.Index(fields=['status', 'updated_at'], name='job_status_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.24 on 2026-10-19 12:45
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('input_app', '0009_transcriptionjob_status_updated_idx'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='transcriptionjob',
+            name='owner',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='transcriptionjob',
+            index=models.Index(fields=['owner', '-created_at', '-id'], name='job_owner_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transcriptionjob',
+            index=models.Index(fields=['-created_at', '-id'], name='job_created_idx'),
+        ),
+    ]
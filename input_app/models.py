@@ -12,7 +12,8 @@ class TranscriptionJob(models.Model):
     def __str__(self):
         return f"{self.title} - {self.job_uuid} - {self.status}"
     # Ownership
-    owner = models.ForeignKey(get_user_model(), null=True, blank=True, on_delete=models.SET_NULL)
+    owner = models.ForeignKey(get_user_model(), null=True, blank=True, on_delete=models.SET_NULL,
+                              db_index=False)  # covered by job_owner_created_idx
 
     # Stable ID for file paths
     job_uuid = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
@@ -28,12 +29,16 @@ class TranscriptionJob(models.Model):
     # B) Storage keys / Artifacts (local now, S3 later)
     source_audio = models.FileField(upload_to=job_dir, blank=True)  # e.g., source.mp3
     wav_audio = models.FileField(upload_to=job_dir, blank=True)     # e.g., audio_16k.wav
+    waveform_peaks = models.FileField(upload_to=job_dir, blank=True)  # waveform.peaks (see waveform.py)
     transcript_json = models.FileField(upload_to=job_dir, blank=True)
     transcript_vtt = models.FileField(upload_to=job_dir, blank=True)
+    # Low-bitrate HLS playback (playlist key; stream + clips live beside it)
+    playback_playlist = models.FileField(upload_to=job_dir, blank=True)
 
     # Processing/meta
     language = models.CharField(max_length=16, blank=True)
     segment_count = models.IntegerField(null=True, blank=True)
+    clip_count = models.IntegerField(null=True, blank=True)  # pre-cut per-cue clips
 
     STATUS = [
         ("queued", "Queued"),
@@ -43,6 +48,7 @@ class TranscriptionJob(models.Model):
         ("ready", "Ready"),
         ("failed", "Failed"),
         ("awaiting_transcription", "Awaiting_transcription"),
+        ("waiting", "Waiting"),  # admission waiting room, see admission.py
     ]
     status = models.CharField(max_length=32, choices=STATUS, default="queued")
     error_message = models.TextField(blank=True)
@@ -55,6 +61,43 @@ class TranscriptionJob(models.Model):
     percent = models.PositiveSmallIntegerField(validators=[MinValueValidator(0), MaxValueValidator(100)], default=0)
     message = models.CharField(max_length=300, blank=True)
 
+    # Resumable pipeline: {stage: {"done_at", "key", "size", "crc32c"}} per finished stage
+    checkpoints = models.JSONField(default=dict, blank=True)
+
+    class Meta:
+        indexes = [
+            # lifecycle scans: status = X and updated_at < cutoff, keyset by (updated_at, id)
+            models.Index(fields=["status", "updated_at"], name="job_status_updated_idx"),
+            # keyset pagination (see pagination.py): "my jobs" library and admin changelist
+            models.Index(fields=["owner", "-created_at", "-id"], name="job_owner_created_idx"),
+            models.Index(fields=["-created_at", "-id"], name="job_created_idx"),
+        ]
+
     @property
     def is_ready(self):
-        return self.status == "ready"
\ No newline at end of file
+        return self.status == "ready"
+
+
+class JobEvent(models.Model):
+    """
+    Append-only progress timeline. Progress ticks and heartbeats land here
+    (narrow row, batched inserts) instead of rewriting TranscriptionJob;
+    the job row only changes on real status transitions.
+    """
+    # the (job, ts) index below covers job lookups, so skip the default FK index
+    job = models.ForeignKey(TranscriptionJob, on_delete=models.CASCADE, related_name="events", db_index=False)
+    stage = models.CharField(max_length=32, choices=TranscriptionJob.STATUS)
+    percent = models.PositiveSmallIntegerField(default=0)
+    message = models.CharField(max_length=300, blank=True)
+    ts = models.DateTimeField()
+
+    # Compaction rolls old events into one summary row per (job, stage):
+    # count = events covered, first_ts..ts = time span. Raw events have first_ts = NULL.
+    count = models.PositiveIntegerField(default=1)
+    first_ts = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["job", "ts"], name="jobevent_job_ts_idx")]
+
+    def __str__(self):
+        return f"{self.job_id} {self.stage} {self.percent}% @ {self.ts:%Y-%m-%d %H:%M:%S}"
@@ -0,0 +1,37 @@
+import base64
+from datetime import datetime
+from django.db.models import Q
+
+# Keyset ("seek") pagination over (created_at, id), newest first.
+# The cursor is the last row of the previous page, so every page is one
+# index range scan — no OFFSET, no COUNT(*).
+
+CURSOR_VAR = "after"
+
+
+def encode_cursor(created_at: datetime, pk: int) -> str:
+    raw = f"{created_at.isoformat()}|{pk}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str):
+    """(created_at, pk) from a cursor; ValueError if it's malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode()
+        created_at, pk = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(pk)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"bad cursor {token!r}") from e
+
+
+def keyset_page(qs, cursor, size: int):
+    """Returns (rows, next_cursor or None) for the page after `cursor`."""
+    qs = qs.order_by("-created_at", "-id")
+    if cursor:
+        created_at, pk = decode_cursor(cursor)
+        qs = qs.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+    rows = list(qs[:size + 1])  # one extra row tells us whether there's a next page
+    if len(rows) <= size:
+        return rows, None
+    rows = rows[:size]
+    return rows, encode_cursor(rows[-1].created_at, rows[-1].id)
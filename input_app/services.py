@@ -1,12 +1,55 @@
-import os, subprocess, datetime, tempfile
+import os, sys, subprocess, datetime, tempfile, shutil, base64
+from concurrent.futures import ThreadPoolExecutor
 from typing import Callable, Optional
+import google_crc32c
+import requests
+from google.api_core import exceptions as gapi_exceptions
+from google.auth import exceptions as gauth_exceptions
+from django.conf import settings
 from django.core.files import File
-from yt_dlp import YoutubeDL
+from django.core.files.storage import default_storage
+from . import waveform
+from .gcs_utils import blob_info, signed_get_url, open_object, upload_file
+from .transcripts import FORMATS, iter_vtt_segments, encode_chunks, compressed_encodings, write_compressed
 
 ProgressCB = Optional[Callable[[str, int, str], None]]  # (step, percent, message)
 
+# Pipeline stages, in order. Each one records a checkpoint on job.checkpoints
+# so a retry / re-run starts at the first stage that isn't done yet.
+STAGE_METADATA = "metadata"
+STAGE_SOURCE = "source_stored"
+STAGE_WAV = "wav_stored"
+STAGE_PEAKS = "waveform_peaks"
+STAGE_PLAYBACK = "playback"  # post-transcription, see build_playback_files
+STAGE_EXPORTS = "exports"    # post-transcription, see build_transcript_exports
+
+# Errors worth retrying: network blips, storage 5xx/429 (+ yt-dlp transport
+# failures, see is_transient_error)
+TRANSIENT_ERRORS = (
+    ConnectionError,
+    TimeoutError,
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    gapi_exceptions.ServerError,
+    gapi_exceptions.TooManyRequests,
+    gauth_exceptions.TransportError,
+)
+
+def is_transient_error(exc: BaseException) -> bool:
+    # yt-dlp is imported lazily (it's slow to import); if it never was, it can't have raised
+    if "yt_dlp" in sys.modules:
+        from yt_dlp.utils import DownloadError
+        from yt_dlp.networking.exceptions import TransportError
+        if isinstance(exc, DownloadError) and exc.exc_info:
+            # yt-dlp wraps the real cause; only network problems are retryable
+            exc = exc.exc_info[1]
+        if isinstance(exc, TransportError):
+            return True
+    return isinstance(exc, TRANSIENT_ERRORS)
+
 # Step 1: extract metadata (no download)
 def ytdlp_extract_metadata(url: str):
+    from yt_dlp import YoutubeDL  # heavy; keep it out of web/worker startup
     ydl_opts = {"quiet": True, "no_warnings": True, "noplaylist": True, "skip_download": True}
     with YoutubeDL(ydl_opts) as ydl:
         info = ydl.extract_info(url, download=False)
@@ -22,6 +65,7 @@ def ytdlp_extract_metadata(url: str):
 
 # Step 2: download best audio as mp3 into a temp path we control
 def ytdlp_download_audio_mp3(url: str, out_path: str, progress_hook: Optional[Callable]=None) -> str:
+    from yt_dlp import YoutubeDL
     ydl_opts = {
         "format": "bestaudio/best",
         "outtmpl": out_path,  # e.g., "/tmp/<youtube_id>.%(ext)s"
@@ -44,14 +88,68 @@ def ffmpeg_to_wav_16k_mono(src_path: str, dst_path: str):
     cmd = ["ffmpeg", "-y", "-i", src_path, "-ac", "1", "-ar", "16000", "-f", "wav", dst_path]
     subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
 
+# ---- checkpoints ---------------------------------------------------
+
+def file_crc32c(path: str) -> str:
+    """CRC32C of a local file, base64-encoded the same way GCS reports blob.crc32c."""
+    checksum = google_crc32c.Checksum()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            checksum.update(chunk)
+    return base64.b64encode(checksum.digest()).decode("ascii")
+
+def stage_done(job, stage: str) -> bool:
+    return stage in (job.checkpoints or {})
+
+def mark_stage(job, stage: str, **info):
+    job.checkpoints = {
+        **(job.checkpoints or {}),
+        stage: {"done_at": datetime.datetime.now(datetime.timezone.utc).isoformat(), **info},
+    }
+
+def artifact_intact(job, stage: str, field) -> bool:
+    """True if the stage's artifact is still in storage with the recorded size and CRC."""
+    cp = (job.checkpoints or {}).get(stage)
+    if not cp or not field or field.name != cp.get("key"):
+        return False
+    return blob_info(cp["key"]) == (cp.get("size"), cp.get("crc32c"))
+
+def store_artifact(job, stage: str, field, filename: str, local_path: str, **info):
+    with open(local_path, "rb") as f:
+        field.save(filename, File(f), save=False)
+    mark_stage(job, stage, key=field.name, size=os.path.getsize(local_path),
+               crc32c=file_crc32c(local_path), **info)
+    job.save(update_fields=[field.field.name, "checkpoints", "updated_at"])
+
 # High-level orchestration for A + B
 def prepare_job_files(job, on_progress: ProgressCB = None, tmp_dir: Optional[str] = None):
     """
     - Extract metadata, store DB
     - Download MP3 (yt-dlp) with optional progress callback
     - Convert to 16k mono WAV (ffmpeg)
+    - Compute waveform peaks from the WAV (numpy, memory-mapped)
     - Save FileFields to storage (GCS via django-storages)
+
+    Every stage is checkpointed on job.checkpoints. Stages already done (and
+    whose artifact still matches the recorded size/CRC) are skipped, so a
+    retry only pays for the stage that failed.
     """
+    if not stage_done(job, STAGE_METADATA):
+        _store_metadata(job)
+
+    # B) Work in a temp dir unless provided
+    cleanup = False
+    if tmp_dir is None:
+        tmp_dir = tempfile.mkdtemp(prefix="prep_")
+        cleanup = True
+
+    try:
+        _prepare_audio_files(job, on_progress, tmp_dir)
+    finally:
+        if cleanup:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+def _store_metadata(job):
     # A) Metadata
     meta = ytdlp_extract_metadata(job.youtube_url)
     job.youtube_id = meta["youtube_id"] or job.youtube_id
@@ -65,28 +163,44 @@ def prepare_job_files(job, on_progress: ProgressCB = None, tmp_dir: Optional[str
         job.published_at = datetime.datetime(yy, mm, dd, tzinfo=datetime.timezone.utc)
     job.duration_sec = meta["duration_sec"] or None
     #job.status = "downloading"
-    job.save()
-
-
-    # B) Work in a temp dir unless provided
+    mark_stage(job, STAGE_METADATA)
+    job.save(update_fields=[
+        "youtube_id", "title", "channel_title", "published_at", "duration_sec",
+        "checkpoints", "updated_at",
+    ])
 
-    # def notify(step, percent, message=""):
-    #     if on_progress:
-    #         on_progress(step, int(max(0, min(100, percent))), message)
+def _prepare_audio_files(job, on_progress: ProgressCB, tmp_dir: str):
+    # progress helper
+    def emit(step, percent, message):
+        if on_progress:
+            on_progress(step, int(max(0, min(100, percent))), message or "")
 
-    # yt-dlp → on_progress adapter
+    wav_tmp = os.path.join(tmp_dir, f"{job.job_uuid}_audio_16k.wav")
+    if artifact_intact(job, STAGE_WAV, job.wav_audio):
+        if artifact_intact(job, STAGE_PEAKS, job.waveform_peaks):
+            emit("converting", 58, "WAV already stored, skipping.")
+            emit("awaiting_transcription", 65, "Waiting for GPU worker…")
+            return
+        emit("converting", 58, "WAV already stored, fetching copy for peaks…")
+        with job.wav_audio.open("rb") as src, open(wav_tmp, "wb") as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+    else:
+        _store_wav(job, emit, tmp_dir, wav_tmp)
 
-    cleanup = False
-    if tmp_dir is None:
-        tmp_dir = tempfile.mkdtemp(prefix="prep_")
-        cleanup = True
+    emit("converting", 62, "Computing waveform peaks…")
+    store_waveform_peaks(job, wav_tmp, tmp_dir)
 
-    try:
-        # progress helper
-        def emit(step, percent, message):
-            if on_progress:
-                on_progress(step, int(max(0, min(100, percent))), message or "")
+    emit("awaiting_transcription", 65, "Waiting for GPU worker…")
 
+def _store_wav(job, emit, tmp_dir: str, wav_tmp: str):
+    mp3_path = os.path.join(tmp_dir, f"{job.job_uuid}_source.mp3")
+    if artifact_intact(job, STAGE_SOURCE, job.source_audio):
+        # Source survived a previous attempt: pull it back from storage
+        # instead of downloading + re-encoding from YouTube again.
+        emit("downloading", 40, "Source already stored, fetching copy…")
+        with job.source_audio.open("rb") as src, open(mp3_path, "wb") as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+    else:
         last = {"overall": -1}
         def yt_hook(d):
             st = d.get("status")
@@ -100,31 +214,29 @@ def prepare_job_files(job, on_progress: ProgressCB = None, tmp_dir: Optional[str
                     emit("downloading", overall, f"Downloading… {pct}%")
             elif st == "finished":
                 emit("downloading", 40, "Download finished.")
-        
+
         emit("downloading", 1, "Starting download…")
         tmp_mp3_tpl = os.path.join(tmp_dir, f"{job.job_uuid}_source.%(ext)s")
         mp3_path = ytdlp_download_audio_mp3(job.youtube_url, tmp_mp3_tpl, progress_hook=yt_hook)
         #emit("downloading", 40, "Download finished.")
 
-        # Convert
-        emit("converting", 50, "Converting to 16k WAV…")
-        wav_tmp = os.path.join(tmp_dir, f"{job.job_uuid}_audio_16k.wav")
-        ffmpeg_to_wav_16k_mono(mp3_path, wav_tmp)
-        emit("converting", 58, "Uploading artifacts…")
+        emit("downloading", 45, "Uploading source audio…")
+        store_artifact(job, STAGE_SOURCE, job.source_audio, "source.mp3", mp3_path)
 
-        # Save to storage
-        with open(mp3_path, "rb") as f:
-            job.source_audio.save("source.mp3", File(f), save=False)
-        with open(wav_tmp, "rb") as f:
-            job.wav_audio.save("audio_16k.wav", File(f), save=False)
-        job.save()
+    # Convert
+    emit("converting", 50, "Converting to 16k WAV…")
+    ffmpeg_to_wav_16k_mono(mp3_path, wav_tmp)
+    emit("converting", 58, "Uploading artifacts…")
 
-        emit("awaiting_transcription", 65, "Waiting for GPU worker…")
+    # Save to storage
+    store_artifact(job, STAGE_WAV, job.wav_audio, "audio_16k.wav", wav_tmp)
 
-    finally:
-        if cleanup:
-            # optional: shutil.rmtree(tmp_dir, ignore_errors=True)
-            pass
+def store_waveform_peaks(job, wav_path: str, tmp_dir: str):
+    """Min/max peak pyramid for the player, stored next to the audio (a few hundred KB/hour)."""
+    sample_rate, levels = waveform.compute_peaks(wav_path)
+    peaks_tmp = os.path.join(tmp_dir, f"{job.job_uuid}_waveform.peaks")
+    directory = waveform.write_peaks(peaks_tmp, sample_rate, levels)
+    store_artifact(job, STAGE_PEAKS, job.waveform_peaks, "waveform.peaks", peaks_tmp, **directory)
 
     # # B) Artifact filenames (under the job’s own directory in MEDIA_ROOT)
     # # We'll generate local temp outputs, then attach them to FileFields so Django puts them under MEDIA_ROOT using upload_to=job_dir
@@ -146,4 +258,133 @@ def prepare_job_files(job, on_progress: ProgressCB = None, tmp_dir: Optional[str
 
     # # wait for transcription
     # job.status = "awaiting_transcription"
-    # job.save()
\ No newline at end of file
+    # job.save()
+
+
+# ---- playback rendition (post-transcription) ------------------------
+
+def ffmpeg_playback_rendition(src: str, out_dir: str, clip_starts=None) -> dict:
+    """
+    One ffmpeg pass over the stored audio producing:
+      - playlist.m3u8 + stream.ts: low-bitrate AAC HLS, single file addressed by
+        byte ranges (one object to sign, players fetch a few KB per segment)
+      - clips/clip_NNNNN.aac: optional cuts at each cue start, so clip i == cue i
+    `src` may be a local path or a signed URL (ffmpeg reads it over HTTPS).
+    """
+    bitrate = settings.PLAYBACK_BITRATE
+    playlist = os.path.join(out_dir, "playlist.m3u8")
+    stream = os.path.join(out_dir, "stream.ts")
+    cmd = [
+        "ffmpeg", "-y", "-i", src,
+        "-map", "0:a", "-ac", "1", "-c:a", "aac", "-b:a", bitrate,
+        "-f", "hls", "-hls_time", str(settings.PLAYBACK_SEGMENT_SEC), "-hls_playlist_type", "vod",
+        "-hls_flags", "single_file", "-hls_segment_filename", stream, playlist,
+    ]
+    clips_dir = os.path.join(out_dir, "clips")
+    if clip_starts:
+        os.makedirs(clips_dir, exist_ok=True)
+        # output-side -ss: clip 0 starts at cue 0, later cut points are relative to it
+        first = clip_starts[0]
+        cmd += ["-map", "0:a", "-ac", "1", "-c:a", "aac", "-b:a", bitrate, "-ss", f"{first:.3f}"]
+        if len(clip_starts) > 1:
+            cmd += [
+                "-f", "segment", "-segment_format", "adts",
+                "-segment_times", ",".join(f"{t - first:.3f}" for t in clip_starts[1:]),
+                os.path.join(clips_dir, "clip_%05d.aac"),
+            ]
+        else:
+            # nothing to cut at; the segment muxer would fall back to 2 s pieces
+            cmd += ["-f", "adts", os.path.join(clips_dir, "clip_00000.aac")]
+    subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    clips = sorted(os.listdir(clips_dir)) if clip_starts else []
+    return {
+        "playlist": playlist,
+        "stream": stream,
+        "clips": [os.path.join(clips_dir, name) for name in clips],
+    }
+
+def _upload(key: str, local_path: str) -> str:
+    with open(local_path, "rb") as f:
+        return default_storage.save(key, File(f))
+
+def build_playback_files(job, tmp_dir: Optional[str] = None):
+    """
+    Build the HLS playback rendition (and per-cue clips) next to the WAV and
+    record it on the job. Skipped when the stored playlist is still intact.
+    """
+    if artifact_intact(job, STAGE_PLAYBACK, job.playback_playlist):
+        return
+
+    clip_starts = None
+    if settings.PLAYBACK_PRECUT_CLIPS and job.transcript_vtt:
+        with open_object(job.transcript_vtt.name) as lines:
+            clip_starts = [seg.start for seg in iter_vtt_segments(lines)]
+
+    if tmp_dir is None:
+        tmp_dir = tempfile.mkdtemp(prefix="playback_")
+    try:
+        # the WAV may already be purged by the lifecycle job; the source works too
+        audio = job.wav_audio or job.source_audio
+        out = ffmpeg_playback_rendition(signed_get_url(audio.name, minutes=60), tmp_dir, clip_starts)
+
+        base_prefix = audio.name.rsplit("/", 1)[0]
+        playlist_key = f"{base_prefix}/playback/playlist.m3u8"
+        stream_key = f"{base_prefix}/playback/stream.ts"
+        clips_prefix = f"{base_prefix}/playback/clips"
+        uploads = [(stream_key, out["stream"])] + [
+            (f"{clips_prefix}/{os.path.basename(path)}", path) for path in out["clips"]
+        ]
+        # lots of small objects: upload them in parallel
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda item: _upload(*item), uploads))
+        # playlist last, so its presence implies the stream/clips are there
+        job.playback_playlist.name = _upload(playlist_key, out["playlist"])
+        job.clip_count = len(out["clips"])
+
+        mark_stage(job, STAGE_PLAYBACK, key=job.playback_playlist.name,
+                   size=os.path.getsize(out["playlist"]), crc32c=file_crc32c(out["playlist"]),
+                   stream_key=stream_key, clips_prefix=clips_prefix)
+        job.save(update_fields=["playback_playlist", "clip_count", "checkpoints", "updated_at"])
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+# ---- transcript exports (post-transcription) --------------------------
+
+def build_transcript_exports(job, tmp_dir: Optional[str] = None):
+    """
+    Precompress the plain (unsliced, monolingual) exports into storage so the
+    export view can hand out a signed URL instead of rendering every time.
+    The VTT is downloaded once; each format is rendered once and fed to every
+    compressor at the same time. Memory stays flat.
+    Worker `complete` clears this checkpoint when a new transcript lands.
+    """
+    if stage_done(job, STAGE_EXPORTS) or not job.transcript_vtt:
+        return
+
+    if tmp_dir is None:
+        tmp_dir = tempfile.mkdtemp(prefix="exports_")
+    try:
+        base_prefix = job.transcript_vtt.name.rsplit("/", 1)[0]
+        vtt_local = os.path.join(tmp_dir, "transcript.vtt")
+        with open_object(job.transcript_vtt.name) as src, open(vtt_local, "w", encoding="utf-8") as dst:
+            shutil.copyfileobj(src, dst)
+
+        variants = {}
+        for fmt in settings.EXPORT_PRECOMPRESSED_FORMATS:
+            render, content_type = FORMATS[fmt]
+            targets = {enc: os.path.join(tmp_dir, f"transcript.{fmt}.{enc}") for enc in compressed_encodings()}
+            with open(vtt_local, encoding="utf-8") as lines:
+                write_compressed(encode_chunks(render(iter_vtt_segments(lines))), targets)
+            variants[fmt] = {
+                encoding: upload_file(
+                    f"{base_prefix}/exports/transcript.{fmt}.{encoding}", local,
+                    content_type=content_type, content_encoding=encoding,
+                    content_disposition=f'attachment; filename="transcript.{fmt}"',
+                )
+                for encoding, local in targets.items()
+            }
+        mark_stage(job, STAGE_EXPORTS, variants=variants)
+        job.save(update_fields=["checkpoints", "updated_at"])
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
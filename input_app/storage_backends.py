@@ -0,0 +1,14 @@
+from storages.backends.gcloud import GoogleCloudStorage
+from .gcs_utils import gcs_client
+
+
+class LazyGoogleCloudStorage(GoogleCloudStorage):
+    """
+    django-storages GCS backend on the process-wide client from gcs_utils,
+    so FileField saves/URLs and our own helpers share credentials and
+    connections, and nothing is loaded until the first storage call.
+    """
+
+    @property
+    def client(self):
+        return gcs_client()
@@ -1,14 +1,22 @@
+from datetime import timedelta
 from celery import shared_task
+from django.conf import settings
 from django.utils.timezone import now
 from .models import TranscriptionJob
-from .services import prepare_job_files
+from .events import record_event, flush_events, compact_events
+from .admission import admit_global
+from .lifecycle import run_lifecycle
+from .services import prepare_job_files, build_playback_files, build_transcript_exports, is_transient_error
 
 from .models import TranscriptionJob
 
 # ---- helpers -------------------------------------------------------
 
 def _update(job: TranscriptionJob, *, step=None, status=None, percent=None, message=None):
-    """Small utility to update a few fields without racey read-modify-writes."""
+    """
+    State transition: update a few fields without racey read-modify-writes and
+    append the new state to the job's event timeline.
+    """
     fields = []
     if step is not None:
         job.step = step
@@ -25,29 +33,98 @@ def _update(job: TranscriptionJob, *, step=None, status=None, percent=None, mess
     job.updated_at = now()
     fields.append("updated_at")
     job.save(update_fields=fields)
+    record_event(job.id, step or status or job.step, job.percent, job.message, buffered=False)
 
 def make_emit_for(job_id: int):
+    # Progress ticks only go to the (batched) event timeline, not the job row
     def emit(step: str, percent: int, message: str):
-        job = TranscriptionJob.objects.get(pk=job_id)
-        _update(job, step=step, percent=percent, message=message)
+        record_event(job_id, step, percent, message)
     return emit
 
 # ---- the task ------------------------------------------------------
 
+# Statuses preparation may (re)start from: failed, or stuck before the GPU queue.
+# Anything past it (queued for / on the GPU, ready) would lose its place or transcript.
+RERUNNABLE_STATUSES = ("failed", "queued", "downloading", "converting")
+
 @shared_task(bind=True, max_retries=2, default_retry_delay=30)
 def prepare_audio(self, job_id: int):
     job = TranscriptionJob.objects.get(pk=job_id)
-    _update(job, step="queued", percent=0, message="Queued")
+    if job.status not in RERUNNABLE_STATUSES:
+        return  # e.g. an admin re-run of a job that has since finished
+    resuming = bool(job.checkpoints)
+    _update(job, status="queued", step="queued", percent=0,
+            message="Resuming…" if resuming else "Queued")
 
     emit = make_emit_for(job_id)
 
     try:
-        # Reuse your service; it updates FileFields and calls emit() at key points
+        # Reuse your service; it updates FileFields and calls emit() at key points.
+        # Finished stages are checkpointed on the job, so a retry resumes there.
         prepare_job_files(job, on_progress=emit)
     except Exception as e:
+        if is_transient_error(e) and self.request.retries < self.max_retries:
+            countdown = self.default_retry_delay * 2 ** self.request.retries  # 30s, 60s, …
+            record_event(job.id, "queued", 0, f"Retrying in {countdown}s ({type(e).__name__}: {e})",
+                         buffered=False)
+            raise self.retry(exc=e, countdown=countdown)
         _update(job, status="failed", message=f"{type(e).__name__}: {e}")
         raise
+    finally:
+        flush_events()
 
     # Final transition for the queue/worker flow:
     _update(job, status="awaiting_transcription", step="awaiting_transcription",
-            percent=65, message="Waiting for GPU worker…")
\ No newline at end of file
+            percent=65, message="Waiting for GPU worker…")
+
+
+@shared_task(bind=True, max_retries=2, default_retry_delay=30)
+def build_playback(self, job_id: int):
+    """Post-transcription: low-bitrate HLS rendition + per-cue clips. The job stays 'ready'."""
+    job = TranscriptionJob.objects.get(pk=job_id)
+    try:
+        build_playback_files(job)
+    except Exception as e:
+        if is_transient_error(e) and self.request.retries < self.max_retries:
+            raise self.retry(exc=e, countdown=self.default_retry_delay * 2 ** self.request.retries)
+        raise
+
+
+@shared_task(bind=True, max_retries=2, default_retry_delay=30)
+def build_exports(self, job_id: int):
+    """Post-transcription: precompressed SRT/VTT/TXT/JSON exports in storage."""
+    job = TranscriptionJob.objects.get(pk=job_id)
+    try:
+        build_transcript_exports(job)
+    except Exception as e:
+        if is_transient_error(e) and self.request.retries < self.max_retries:
+            raise self.retry(exc=e, countdown=self.default_retry_delay * 2 ** self.request.retries)
+        raise
+
+
+@shared_task
+def compact_job_events():
+    """Beat task: roll events older than JOB_EVENT_RETENTION_DAYS into per-stage summaries."""
+    return compact_events(now() - timedelta(days=settings.JOB_EVENT_RETENTION_DAYS))
+
+
+@shared_task
+def admit_waiting_jobs(batch: int = 50):
+    """Beat task: move waiting-room jobs (oldest first) into the pipeline while admission allows."""
+    admitted = 0
+    waiting = (TranscriptionJob.objects.filter(status="waiting")
+               .order_by("created_at").values_list("id", flat=True)[:batch])
+    for job_id in waiting:
+        if not admit_global().admitted:
+            break
+        # conditional update so two overlapping beats can't dispatch the same job
+        if TranscriptionJob.objects.filter(pk=job_id, status="waiting").update(status="queued", updated_at=now()):
+            prepare_audio.delay(job_id)
+            admitted += 1
+    return admitted
+
+
+@shared_task
+def apply_storage_lifecycle(dry_run: bool = False):
+    """Beat task: purge expired intermediate artifacts; returns the per-artifact report."""
+    return run_lifecycle(dry_run=dry_run)
@@ -0,0 +1,81 @@
+import unittest
+from unittest import mock
+
+from django.test import RequestFactory, TestCase, override_settings
+
+from input_app import admission, tasks
+from input_app.models import TranscriptionJob
+
+try:
+    import fakeredis
+except ImportError:  # optional test dependency
+    fakeredis = None
+
+
+@unittest.skipUnless(fakeredis, "needs fakeredis (with Lua support)")
+@override_settings(ADMISSION_OWNER_RATE=0.1, ADMISSION_OWNER_BURST=2,
+                   ADMISSION_GLOBAL_RATE=0.1, ADMISSION_GLOBAL_BURST=3,
+                   ADMISSION_MAX_QUEUE_DEPTH=5, ADMISSION_QUEUE_RETRY_SEC=30,
+                   ADMISSION_MAX_WAITING=3, ADMISSION_TRUST_CF_HEADER=False)
+class AdmissionTests(TestCase):
+    def setUp(self):
+        self.redis = fakeredis.FakeRedis()
+        patcher = mock.patch.object(admission.redis.Redis, "from_url", lambda url: self.redis)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        admission._script = None
+        self.addCleanup(setattr, admission, "_script", None)
+
+    def test_owner_burst_then_retry_after(self):
+        self.assertTrue(admission.charge_owner("ip:1").admitted)
+        self.assertTrue(admission.charge_owner("ip:1").admitted)
+        decision = admission.charge_owner("ip:1")
+        self.assertFalse(decision.admitted)
+        self.assertEqual(decision.retry_after, 10)  # one token at 0.1/s
+        self.assertTrue(admission.charge_owner("ip:2").admitted)  # buckets are per owner
+
+    def test_global_queue_depth(self):
+        self.redis.rpush("celery", *range(5))
+        decision = admission.admit_global()
+        self.assertEqual((decision.admitted, decision.retry_after, decision.queue_depth), (False, 30, 5))
+        self.redis.delete("celery")
+        self.assertTrue(admission.admit_global().admitted)
+
+    def test_owner_key(self):
+        request = RequestFactory().post("/submit/", REMOTE_ADDR="10.0.0.1", HTTP_CF_CONNECTING_IP="1.2.3.4")
+        request.user = mock.Mock(is_authenticated=False)
+        self.assertEqual(admission.owner_key_for(request), "ip:10.0.0.1")
+        with override_settings(ADMISSION_TRUST_CF_HEADER=True):
+            self.assertEqual(admission.owner_key_for(request), "ip:1.2.3.4")
+
+    @mock.patch.object(tasks.prepare_audio, "delay")
+    def test_submit_waiting_room_is_fifo(self, delay):
+        statuses = []
+        for i in range(5):
+            response = self.client.post("/submit/", {"youtube_url": "https://youtu.be/x"}, REMOTE_ADDR=f"10.0.1.{i}")
+            statuses.append(response.status_code)
+        # 3 admitted by the burst, then 1 parked; the waiting room (max 3) takes the rest
+        self.assertEqual(statuses, [302] * 5)
+        self.assertEqual(delay.call_count, 3)
+        self.redis.delete("admission:global")  # bucket refills…
+        self.client.post("/submit/", {"youtube_url": "https://youtu.be/x"}, REMOTE_ADDR="10.0.1.9")
+        # …but the newcomer still queues behind the jobs already waiting
+        self.assertEqual(delay.call_count, 3)
+        self.assertEqual(TranscriptionJob.objects.filter(status="waiting").count(), 3)
+        response = self.client.post("/submit/", {"youtube_url": "https://youtu.be/x"}, REMOTE_ADDR="10.0.1.10")
+        self.assertEqual(response.status_code, 503)
+
+        admitted = tasks.admit_waiting_jobs()
+        self.assertEqual(admitted, 3)
+        first_waiting = TranscriptionJob.objects.order_by("created_at")[3]
+        self.assertEqual(delay.call_args_list[3], mock.call(first_waiting.pk))
+
+    @mock.patch.object(tasks.prepare_audio, "delay")
+    def test_full_waiting_room_costs_no_owner_token(self, delay):
+        for _ in range(3):
+            TranscriptionJob.objects.create(youtube_url="https://youtu.be/x", status="waiting")
+        for _ in range(3):
+            response = self.client.post("/submit/", {"youtube_url": "https://youtu.be/x"}, REMOTE_ADDR="10.0.2.1")
+            self.assertEqual(response.status_code, 503)
+        self.assertTrue(admission.charge_owner("ip:10.0.2.1").admitted)  # burst of 2 untouched
+        self.assertTrue(admission.charge_owner("ip:10.0.2.1").admitted)
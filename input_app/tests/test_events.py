@@ -0,0 +1,64 @@
+from datetime import timedelta
+
+import time
+
+from django.test import TestCase, TransactionTestCase
+from django.utils.timezone import now
+
+from input_app.events import EventBuffer, _event, compact_events, latest_event
+from input_app.models import JobEvent, TranscriptionJob
+
+
+class CompactionTests(TestCase):
+    def setUp(self):
+        self.job = TranscriptionJob.objects.create(youtube_url="https://youtu.be/x", status="failed")
+        self.old = now() - timedelta(days=10)
+
+    def add(self, stage, percent, message, ts):
+        return JobEvent.objects.create(job=self.job, stage=stage, percent=percent, message=message, ts=ts)
+
+    def test_rolls_old_events_into_stage_summaries(self):
+        for i, percent in enumerate((5, 20, 45)):
+            self.add("downloading", percent, f"{percent}%", self.old + timedelta(seconds=i))
+        self.add("converting", 50, "ffmpeg", self.old + timedelta(seconds=10))
+        self.add("failed", 0, "ValueError: broken", self.old + timedelta(seconds=11))
+        recent = self.add("queued", 0, "Retrying", now())
+
+        self.assertEqual(compact_events(now() - timedelta(days=7)), 5)
+
+        summaries = JobEvent.objects.exclude(pk=recent.pk).order_by("ts")
+        self.assertEqual(
+            [(e.stage, e.percent, e.message, e.count) for e in summaries],
+            [("downloading", 45, "45%", 3), ("converting", 50, "ffmpeg", 1), ("failed", 0, "ValueError: broken", 1)],
+        )
+        downloading = summaries[0]
+        self.assertEqual((downloading.first_ts, downloading.ts), (self.old, self.old + timedelta(seconds=2)))
+        self.assertEqual(JobEvent.objects.get(pk=recent.pk).first_ts, None)  # newer events untouched
+
+    def test_latest_event_keeps_its_message(self):
+        self.add("converting", 50, "Converting…", self.old)
+        self.add("failed", 0, "DownloadError: private video", self.old + timedelta(seconds=1))
+        compact_events(now())
+        self.assertEqual(latest_event(self.job.id).message, "DownloadError: private video")
+        status = self.client.get(f"/jobs/{self.job.job_uuid}/status").json()
+        self.assertEqual(status["message"], "DownloadError: private video")
+
+    def test_summaries_are_not_compacted_again(self):
+        self.add("downloading", 10, "a", self.old)
+        self.add("downloading", 20, "b", self.old + timedelta(seconds=1))
+        self.assertEqual(compact_events(now()), 2)
+        self.assertEqual(compact_events(now()), 0)
+        self.assertEqual(JobEvent.objects.get().count, 2)
+
+
+class EventBufferTests(TransactionTestCase):
+    def test_flushes_after_max_age_without_further_events(self):
+        job = TranscriptionJob.objects.create(youtube_url="https://youtu.be/x", status="converting")
+        buffer = EventBuffer(max_size=100, max_age=0.05)
+        buffer.add(_event(job.id, "converting", 62, "Uploading artifacts…"))
+        self.assertIsNone(latest_event(job.id))
+
+        deadline = time.monotonic() + 5
+        while latest_event(job.id) is None and time.monotonic() < deadline:
+            time.sleep(0.02)
+        self.assertEqual(latest_event(job.id).message, "Uploading artifacts…")
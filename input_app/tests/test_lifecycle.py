@@ -0,0 +1,119 @@
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils.timezone import now
+
+from input_app import gcs_utils, lifecycle
+from input_app.models import TranscriptionJob
+
+
+@override_settings(STORAGE_LIFECYCLE_POLICIES=[{"artifact": "wav_audio", "status": "ready", "after_days": 7}])
+class LifecycleTests(TestCase):
+    def setUp(self):
+        self.old = now() - timedelta(days=10)
+        self.deleted = []
+        self.failing = set()
+
+    def make_job(self, n, status="ready", updated_at=None, size=1000):
+        key = f"jobs/{n}/audio_16k.wav"
+        job = TranscriptionJob.objects.create(youtube_url="https://youtu.be/x", status=status)
+        # queryset update: auto_now would otherwise overwrite updated_at
+        TranscriptionJob.objects.filter(pk=job.pk).update(
+            wav_audio=key, updated_at=updated_at or self.old,
+            checkpoints={"wav_stored": {"key": key, "size": size}},
+        )
+        return key
+
+    def delete_objects(self, keys):
+        self.deleted.append(list(keys))
+        return [key for key in keys if key not in self.failing]
+
+    def run_lifecycle(self, **kwargs):
+        with mock.patch.object(lifecycle, "delete_objects", self.delete_objects), \
+                mock.patch.object(lifecycle, "blob_info", side_effect=AssertionError("size is checkpointed")):
+            return lifecycle.run_lifecycle(**kwargs)
+
+    def remaining(self):
+        return set(TranscriptionJob.objects.exclude(wav_audio="").values_list("wav_audio", flat=True))
+
+    def test_pages_through_expired_jobs(self):
+        keys = [self.make_job(n) for n in range(5)]
+        kept = {self.make_job(10, status="failed"), self.make_job(11, updated_at=now())}
+
+        report = self.run_lifecycle(page_size=2)
+
+        self.assertEqual(report, {"wav_audio": {"jobs": 5, "bytes": 5000, "failed": 0}})
+        self.assertEqual([len(batch) for batch in self.deleted], [2, 2, 1])
+        self.assertEqual(sorted(sum(self.deleted, [])), sorted(keys))
+        self.assertEqual(self.remaining(), kept)
+
+    def test_dry_run_deletes_nothing(self):
+        keys = {self.make_job(n) for n in range(3)}
+        report = self.run_lifecycle(dry_run=True)
+        self.assertEqual(report["wav_audio"], {"jobs": 3, "bytes": 3000, "failed": 0})
+        self.assertEqual(self.deleted, [])
+        self.assertEqual(self.remaining(), keys)
+
+    def test_failed_deletes_keep_their_reference(self):
+        keys = [self.make_job(n) for n in range(4)]
+        self.failing = {keys[1]}
+        report = self.run_lifecycle(page_size=3)
+        self.assertEqual(report["wav_audio"], {"jobs": 3, "bytes": 3000, "failed": 1})
+        self.assertEqual(self.remaining(), {keys[1]})
+
+        self.failing = set()
+        self.assertEqual(self.run_lifecycle()["wav_audio"]["jobs"], 1)  # retried next run
+        self.assertEqual(self.remaining(), set())
+
+
+    def test_legacy_rows_are_sized_before_the_delete(self):
+        key = self.make_job(0)
+        TranscriptionJob.objects.filter(wav_audio=key).update(checkpoints={})  # pre-checkpoint row
+        stored = {key: (115_000_000, "crc")}
+
+        def delete_objects(keys):
+            for k in keys:
+                stored.pop(k, None)
+            return list(keys)
+
+        with mock.patch.object(lifecycle, "delete_objects", delete_objects), \
+                mock.patch.object(lifecycle, "blob_info", lambda k: stored.get(k)):
+            report = lifecycle.run_lifecycle()
+        self.assertEqual(report["wav_audio"], {"jobs": 1, "bytes": 115_000_000, "failed": 0})
+
+
+    def test_policy_waits_for_required_checkpoint(self):
+        policy = {"artifact": "wav_audio", "status": "ready", "after_days": 7, "requires": "playback"}
+        waiting = self.make_job(0)
+        played = self.make_job(1)
+        TranscriptionJob.objects.filter(wav_audio=played).update(
+            checkpoints={"wav_stored": {"key": played, "size": 1000}, "playback": {"key": "p.m3u8"}},
+        )
+        with override_settings(STORAGE_LIFECYCLE_POLICIES=[policy]):
+            report = self.run_lifecycle()
+        self.assertEqual(report["wav_audio"]["jobs"], 1)
+        self.assertEqual(self.remaining(), {waiting})
+
+
+class DeleteObjectsTests(SimpleTestCase):
+    def test_reports_deleted_and_missing_keys_only(self):
+        codes = iter([[204, 404, 403], [503, 204]])
+
+        queued = []
+
+        class Batch:
+            def api_request(self, method, path):
+                queued.append((method, path))
+
+            def finish(self, raise_exception):
+                return [SimpleNamespace(status_code=code) for code in next(codes)]
+
+        client = mock.Mock()
+        client.batch.side_effect = lambda raise_exception: Batch()
+        client.bucket.return_value.blob.side_effect = lambda key: SimpleNamespace(path=f"/b/bk/o/{key}")
+        with mock.patch.object(gcs_utils, "gcs_client", return_value=client):
+            gone = gcs_utils.delete_objects(["a", "b", "c", "d", "e"], batch_size=3)
+        self.assertEqual(gone, ["a", "b", "e"])
+        self.assertEqual(queued, [("DELETE", f"/b/bk/o/{key}") for key in "abcde"])
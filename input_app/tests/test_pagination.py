@@ -0,0 +1,71 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils.timezone import now
+
+from input_app.models import TranscriptionJob
+from input_app.pagination import decode_cursor, encode_cursor, keyset_page
+
+
+class CursorTests(TestCase):
+    def test_round_trip(self):
+        ts = now()
+        self.assertEqual(decode_cursor(encode_cursor(ts, 42)), (ts, 42))
+
+    def test_malformed(self):
+        for token in ("", "zzz", "bm90IGEgY3Vyc29y", encode_cursor(now(), 1)[:-3] + "@@@"):
+            with self.subTest(token=token), self.assertRaises(ValueError):
+                decode_cursor(token)
+
+
+class KeysetPageTests(TestCase):
+    def make_jobs(self, n, owner=None):
+        base = now()
+        jobs = [TranscriptionJob.objects.create(youtube_url="https://youtu.be/x", title=str(i), owner=owner)
+                for i in range(n)]
+        for i, job in enumerate(jobs):
+            # pairs share a created_at so the id tie-breaker matters
+            TranscriptionJob.objects.filter(pk=job.pk).update(created_at=base - timedelta(seconds=i // 2))
+        return TranscriptionJob.objects.order_by("-created_at", "-id")
+
+    def walk(self, qs, size):
+        pages, cursor = [], None
+        while True:
+            rows, cursor = keyset_page(qs, cursor, size)
+            pages.append([job.pk for job in rows])
+            if cursor is None:
+                return pages
+
+    def test_every_row_once_in_order(self):
+        expected = list(self.make_jobs(11).values_list("pk", flat=True))
+        pages = self.walk(TranscriptionJob.objects.all(), 4)
+        self.assertEqual([len(p) for p in pages], [4, 4, 3])
+        self.assertEqual(sum(pages, []), expected)
+
+    def test_exact_multiple_has_no_empty_last_page(self):
+        self.make_jobs(8)
+        self.assertEqual([len(p) for p in self.walk(TranscriptionJob.objects.all(), 4)], [4, 4])
+
+    def test_empty(self):
+        self.assertEqual(keyset_page(TranscriptionJob.objects.all(), None, 5), ([], None))
+
+    def test_filtered_queryset(self):
+        owner = get_user_model().objects.create_user("learner")
+        self.make_jobs(3)
+        self.make_jobs(5, owner=owner)
+        pages = self.walk(TranscriptionJob.objects.filter(owner=owner), 2)
+        self.assertEqual([len(p) for p in pages], [2, 2, 1])
+        self.assertEqual(TranscriptionJob.objects.filter(pk__in=sum(pages, []), owner=owner).count(), 5)
+
+    def test_library_view(self):
+        owner = get_user_model().objects.create_user("learner", password="pw")
+        self.make_jobs(30, owner=owner)
+        self.assertEqual(self.client.get("/library/").status_code, 302)  # login required
+        self.client.login(username="learner", password="pw")
+        first = self.client.get("/library/")
+        self.assertEqual(len(first.context["jobs"]), 25)
+        second = self.client.get("/library/", {"after": first.context["next_cursor"]})
+        self.assertEqual(len(second.context["jobs"]), 5)
+        self.assertIsNone(second.context["next_cursor"])
+        self.assertEqual(self.client.get("/library/", {"after": "nope"}).status_code, 400)
@@ -0,0 +1,79 @@
+import os
+import tempfile
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+
+from input_app import services, views
+from input_app.models import TranscriptionJob
+
+PLAYLIST = """#EXTM3U
+#EXT-X-VERSION:4
+#EXT-X-TARGETDURATION:6
+#EXT-X-BYTERANGE:48128@0
+stream.ts
+#EXT-X-BYTERANGE:47940@48128
+stream.ts
+#EXT-X-ENDLIST
+"""
+
+
+class RenditionCommandTests(SimpleTestCase):
+    def render(self, clip_starts):
+        with tempfile.TemporaryDirectory() as out_dir, \
+                mock.patch.object(services.subprocess, "run") as run:
+            services.ffmpeg_playback_rendition("in.wav", out_dir, clip_starts)
+        cmd = run.call_args.args[0]
+        # the clip output's options follow the HLS output path
+        return cmd[next(i for i, arg in enumerate(cmd) if arg.endswith("playlist.m3u8")) + 1:]
+
+    def test_clips_are_cut_relative_to_the_first_cue(self):
+        clips = self.render([1.5, 4.0, 9.25])
+        self.assertEqual(clips[clips.index("-ss") + 1], "1.500")
+        self.assertEqual(clips[clips.index("-segment_times") + 1], "2.500,7.750")
+        self.assertEqual(os.path.basename(clips[-1]), "clip_%05d.aac")
+
+    def test_single_cue_is_one_whole_clip(self):
+        clips = self.render([0.8])
+        self.assertNotIn("-segment_times", clips)
+        self.assertEqual(clips[clips.index("-f") + 1], "adts")
+        self.assertEqual(os.path.basename(clips[-1]), "clip_00000.aac")
+
+    def test_no_cues_no_clip_output(self):
+        self.assertEqual(self.render(None), [])
+
+
+class PlaybackViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.job = TranscriptionJob.objects.create(
+            youtube_url="https://youtu.be/x", status="ready", clip_count=3,
+            playback_playlist="jobs/1/playback/playlist.m3u8",
+            checkpoints={"playback": {"key": "jobs/1/playback/playlist.m3u8",
+                                      "stream_key": "jobs/1/playback/stream.ts",
+                                      "clips_prefix": "jobs/1/playback/clips"}},
+        )
+
+    async def signed(self, key, minutes=15):
+        return f"https://signed.example/{key}?sig=1"
+
+    def test_playlist_points_at_the_signed_stream(self):
+        async def object_text(key):
+            return PLAYLIST
+
+        with mock.patch.object(views, "aobject_text", object_text), \
+                mock.patch.object(views, "asigned_get_url", self.signed):
+            response = self.client.get(f"/jobs/{self.job.job_uuid}/playback.m3u8")
+        self.assertEqual(response["Content-Type"], "application/vnd.apple.mpegurl")
+        lines = response.content.decode().splitlines()
+        self.assertNotIn("stream.ts", lines)
+        self.assertEqual(lines.count("https://signed.example/jobs/1/playback/stream.ts?sig=1"), 2)
+        self.assertIn("#EXT-X-BYTERANGE:47940@48128", lines)
+
+    def test_clip_redirects_within_bounds(self):
+        with mock.patch.object(views, "asigned_get_url", self.signed):
+            response = self.client.get(f"/jobs/{self.job.job_uuid}/clips/2")
+            self.assertEqual(response.status_code, 302)
+            self.assertEqual(response["Location"], "https://signed.example/jobs/1/playback/clips/clip_00002.aac?sig=1")
+            self.assertEqual(self.client.get(f"/jobs/{self.job.job_uuid}/clips/3").status_code, 404)
@@ -0,0 +1,159 @@
+import os
+import shutil
+import sys
+import tempfile
+import wave
+from unittest import mock
+
+import numpy as np
+from django.core.files.storage import FileSystemStorage
+from django.test import SimpleTestCase, TestCase
+
+from input_app import services, tasks
+from input_app.models import TranscriptionJob
+
+FILE_FIELDS = ("source_audio", "wav_audio", "waveform_peaks")
+
+
+class PreparationTests(TestCase):
+    """prepare_job_files against a local storage; yt-dlp and ffmpeg are stubbed."""
+
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+        self.storage = FileSystemStorage(location=root)
+        for name in FILE_FIELDS:
+            patcher = mock.patch.object(TranscriptionJob._meta.get_field(name), "storage", self.storage)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.calls = {"metadata": 0, "download": 0, "ffmpeg": 0}
+        for target, stub in (("blob_info", self.blob_info),
+                             ("ytdlp_extract_metadata", self.extract_metadata),
+                             ("ytdlp_download_audio_mp3", self.download),
+                             ("ffmpeg_to_wav_16k_mono", self.to_wav)):
+            patcher = mock.patch.object(services, target, stub)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.job = TranscriptionJob.objects.create(youtube_url="https://youtu.be/x", status="queued")
+
+    # -- stubs --------------------------------------------------------
+
+    def blob_info(self, key):
+        if not self.storage.exists(key):
+            return None
+        path = self.storage.path(key)
+        return os.path.getsize(path), services.file_crc32c(path)
+
+    def extract_metadata(self, url):
+        self.calls["metadata"] += 1
+        return {"youtube_id": "x", "title": "t", "channel_title": "c", "published_at": "20240102",
+                "duration_sec": 1.0, "ext": "webm"}
+
+    def download(self, url, out_path, progress_hook=None):
+        self.calls["download"] += 1
+        mp3_path = os.path.splitext(out_path)[0] + ".mp3"
+        with open(mp3_path, "wb") as f:
+            f.write(b"ID3 fake mp3")
+        return mp3_path
+
+    def to_wav(self, src_path, dst_path):
+        self.calls["ffmpeg"] += 1
+        with open(src_path, "rb") as f:
+            assert f.read() == b"ID3 fake mp3"
+        with wave.open(dst_path, "wb") as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(16000)
+            w.writeframes(np.arange(16000, dtype="<i2").tobytes())
+
+    # -- helpers ------------------------------------------------------
+
+    def prepare(self):
+        self.job.refresh_from_db()
+        self.calls = dict.fromkeys(self.calls, 0)
+        services.prepare_job_files(self.job)
+        self.job.refresh_from_db()
+        return self.calls
+
+    def lose(self, *fields):
+        for name in fields:
+            self.storage.delete(getattr(self.job, name).name)
+
+    # -- tests --------------------------------------------------------
+
+    def test_fresh_run_checkpoints_every_stage(self):
+        self.assertEqual(self.prepare(), {"metadata": 1, "download": 1, "ffmpeg": 1})
+        self.assertEqual(set(self.job.checkpoints),
+                         {"metadata", "source_stored", "wav_stored", "waveform_peaks"})
+        self.assertEqual(self.job.checkpoints["wav_stored"]["key"], self.job.wav_audio.name)
+
+    def test_intact_artifacts_are_skipped(self):
+        self.prepare()
+        self.assertEqual(self.prepare(), {"metadata": 0, "download": 0, "ffmpeg": 0})
+
+    def test_resumes_at_first_incomplete_stage(self):
+        self.prepare()
+        self.lose("waveform_peaks")
+        self.assertEqual(self.prepare(), {"metadata": 0, "download": 0, "ffmpeg": 0})
+        self.assertTrue(self.storage.exists(self.job.waveform_peaks.name))
+
+    def test_refetches_source_when_only_the_mp3_survived(self):
+        self.prepare()
+        self.lose("wav_audio", "waveform_peaks")
+        self.assertEqual(self.prepare(), {"metadata": 0, "download": 0, "ffmpeg": 1})
+        self.assertTrue(self.storage.exists(self.job.wav_audio.name))
+
+    def test_changed_artifact_is_rebuilt(self):
+        self.prepare()
+        with open(self.storage.path(self.job.wav_audio.name), "ab") as f:
+            f.write(b"truncated upload")  # size/CRC no longer match the checkpoint
+        self.assertEqual(self.prepare(), {"metadata": 0, "download": 0, "ffmpeg": 1})
+
+    def test_temp_dir_is_removed(self):
+        made, real_mkdtemp = [], tempfile.mkdtemp
+
+        def mkdtemp(**kwargs):
+            made.append(real_mkdtemp(**kwargs))
+            return made[-1]
+
+        with mock.patch.object(services.tempfile, "mkdtemp", mkdtemp):
+            self.prepare()
+        self.assertEqual(len(made), 1)
+        self.assertFalse(os.path.exists(made[0]))
+
+
+class RetryTests(TestCase):
+    def setUp(self):
+        self.job = TranscriptionJob.objects.create(youtube_url="https://youtu.be/x", status="queued")
+
+    def run_task(self, *effects):
+        with mock.patch.object(tasks, "prepare_job_files", side_effect=effects) as prepare:
+            tasks.prepare_audio.apply(args=[self.job.id])
+        self.job.refresh_from_db()
+        return prepare.call_count
+
+    def test_transient_error_is_retried(self):
+        self.assertEqual(self.run_task(ConnectionResetError("reset"), None), 2)
+        self.assertEqual(self.job.status, "awaiting_transcription")
+
+    def test_permanent_error_fails_the_job(self):
+        self.assertEqual(self.run_task(ValueError("broken")), 1)
+        self.assertEqual((self.job.status, self.job.message), ("failed", "ValueError: broken"))
+
+
+class TransientErrorTests(SimpleTestCase):
+    def test_only_network_failures_inside_yt_dlp_errors_are_transient(self):
+        from yt_dlp.networking.exceptions import TransportError
+        from yt_dlp.utils import DownloadError, ExtractorError
+
+        def wrapped(cause):
+            try:
+                raise cause
+            except Exception as e:
+                return DownloadError(str(e), exc_info=sys.exc_info())
+
+        self.assertTrue(services.is_transient_error(wrapped(TransportError("timed out"))))
+        self.assertFalse(services.is_transient_error(wrapped(ExtractorError("Private video", expected=True))))
+        self.assertFalse(services.is_transient_error(ValueError("bad url")))
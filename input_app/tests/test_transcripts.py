@@ -0,0 +1,111 @@
+import gzip
+import json
+import os
+import tempfile
+
+from django.test import SimpleTestCase
+
+from input_app.transcripts import (
+    Segment, encode_chunks, iter_vtt_segments, pair_segments, render_json, render_srt,
+    render_txt, render_vtt, slice_segments, write_compressed,
+)
+
+VTT = """WEBVTT
+
+1
+00:00.000 --> 00:03.200
+Hello there
+
+2
+00:03.200 --> 00:07.500 align:start
+Second
+line two
+
+00:00:15.000 --> 00:00:20.000
+Third line
+"""
+
+
+class ParseTests(SimpleTestCase):
+    def test_cues(self):
+        segments = list(iter_vtt_segments(VTT.splitlines(keepends=True)))
+        self.assertEqual(segments, [
+            Segment(1, 0.0, 3.2, "Hello there"),
+            Segment(2, 3.2, 7.5, "Second\nline two"),
+            Segment(3, 15.0, 20.0, "Third line"),  # no id line, no trailing blank line
+        ])
+
+    def test_hours_and_comma_separator(self):
+        [seg] = iter_vtt_segments(["01:02:03,450 --> 01:02:04,000\n", "x\n"])
+        self.assertAlmostEqual(seg.start, 3723.45)
+        self.assertAlmostEqual(seg.end, 3724.0)
+
+    def test_header_only(self):
+        self.assertEqual(list(iter_vtt_segments(["WEBVTT\n", "\n"])), [])
+
+
+class TransformTests(SimpleTestCase):
+    segments = [Segment(1, 0, 3, "a"), Segment(2, 3, 7, "b"), Segment(3, 15, 20, "c")]
+
+    def test_slice_keeps_overlapping_cues(self):
+        self.assertEqual([s.index for s in slice_segments(self.segments, 2.5, 16)], [1, 2, 3])
+        self.assertEqual([s.index for s in slice_segments(self.segments, 3, 15)], [2])
+        self.assertEqual([s.index for s in slice_segments(self.segments)], [1, 2, 3])
+
+    def test_slice_stops_reading_past_end(self):
+        def source():
+            yield from self.segments[:2]
+            raise AssertionError("read past the slice")
+        self.assertEqual([s.index for s in slice_segments(source(), None, 3)], [1])
+
+    def test_pair_by_midpoint(self):
+        secondary = [Segment(1, 0.1, 3, "uno"), Segment(2, 4, 7, "dos"),
+                     Segment(3, 9, 10, "gap"), Segment(4, 16, 19, "tres")]
+        paired = list(pair_segments(self.segments, secondary))
+        self.assertEqual([s.translation for s in paired], ["uno", "dos", "tres"])
+        self.assertEqual([s.text for s in paired], ["a", "b", "c"])
+
+    def test_pair_with_empty_secondary(self):
+        self.assertEqual([s.translation for s in pair_segments(self.segments, [])], ["", "", ""])
+
+
+class RenderTests(SimpleTestCase):
+    segments = [Segment(1, 0, 3.2, "Hello"), Segment(2, 3661.5, 3662, "Bye", "Adiós")]
+
+    def test_srt(self):
+        self.assertEqual("".join(render_srt(self.segments)),
+                         "1\n00:00:00,000 --> 00:00:03,200\nHello\n\n"
+                         "2\n01:01:01,500 --> 01:01:02,000\nBye\nAdiós\n\n")
+
+    def test_vtt(self):
+        out = "".join(render_vtt(self.segments))
+        self.assertTrue(out.startswith("WEBVTT\n\n1\n00:00:00.000 --> 00:00:03.200\nHello\n\n"))
+        # round-trips through the parser
+        self.assertEqual([s[:3] for s in iter_vtt_segments(out.splitlines())],
+                         [(1, 0.0, 3.2), (2, 3661.5, 3662.0)])
+
+    def test_txt(self):
+        self.assertEqual("".join(render_txt(self.segments)), "Hello\nBye\n    Adiós\n")
+
+    def test_json(self):
+        data = json.loads("".join(render_json(self.segments)))
+        self.assertEqual(data["segments"][1], {"index": 2, "start": 3661.5, "end": 3662,
+                                               "text": "Bye", "translation": "Adiós"})
+        self.assertEqual(json.loads("".join(render_json([]))), {"segments": []})
+
+
+class EncodeTests(SimpleTestCase):
+    def test_encode_chunks_coalesces(self):
+        chunks = list(encode_chunks(["ab", "cd", "é", "f"], chunk_size=4))
+        self.assertEqual(chunks, [b"abcd", "éf".encode()])
+
+    def test_write_compressed_gzip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "out.gz")
+            write_compressed(iter([b"hello ", b"world"]), {"gzip": path})
+            with gzip.open(path) as f:
+                self.assertEqual(f.read(), b"hello world")
+
+    def test_write_compressed_unknown_encoding(self):
+        with tempfile.TemporaryDirectory() as tmp, self.assertRaises(ValueError):
+            write_compressed(iter([b"x"]), {"zstd": os.path.join(tmp, "out.zst")})
@@ -0,0 +1,95 @@
+import os
+import struct
+import tempfile
+import wave
+
+import numpy as np
+from django.test import SimpleTestCase
+
+from input_app import waveform
+
+
+def write_wav(path, samples, rate=16000, channels=1):
+    with wave.open(path, "wb") as w:
+        w.setnchannels(channels)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(np.asarray(samples, dtype="<i2").tobytes())
+
+
+class WaveformTests(SimpleTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def test_pcm16_data(self):
+        write_wav(self.path("a.wav"), np.zeros(1000), rate=8000)
+        rate, offset, n = waveform.wav_pcm16_data(self.path("a.wav"))
+        self.assertEqual((rate, offset, n), (8000, 44, 1000))
+
+    def test_rejects_stereo(self):
+        write_wav(self.path("s.wav"), np.zeros(100), channels=2)
+        with self.assertRaises(ValueError):
+            waveform.wav_pcm16_data(self.path("s.wav"))
+
+    def test_reduce_pads_the_tail(self):
+        mins, maxs = waveform.reduce_peaks(np.array([-1, -5, 0, -2, -3]), np.array([1, 5, 0, 2, 9]), 2)
+        self.assertEqual(mins.tolist(), [-5, -2, -3])
+        self.assertEqual(maxs.tolist(), [5, 2, 9])
+
+    def test_round_trip(self):
+        rng = np.random.default_rng(0)
+        samples = rng.integers(-32768, 32767, size=128 * 5000 + 77, dtype=np.int16)
+        write_wav(self.path("a.wav"), samples)
+
+        rate, levels = waveform.compute_peaks(self.path("a.wav"))
+        self.assertEqual(rate, 16000)
+        spp, mins, maxs = levels[0]
+        self.assertEqual((spp, len(mins)), (waveform.BASE_SAMPLES_PER_PEAK, 5001))
+        self.assertEqual(mins[0], samples[:128].min())
+        self.assertEqual(maxs[-1], samples[128 * 5000:].max())  # partial last block
+        # 5001 -> 1251 -> 313 peaks: stops once a level is under 4 * MIN_LEVEL_PEAKS
+        self.assertEqual([(level[0], len(level[1])) for level in levels], [(128, 5001), (512, 1251), (2048, 313)])
+
+        directory = waveform.write_peaks(self.path("w.peaks"), rate, levels)
+        with open(self.path("w.peaks"), "rb") as f:
+            data = f.read()
+        magic, version, sample_rate, n_levels = struct.unpack_from("<4sHIH", data)
+        self.assertEqual((magic, version, sample_rate, n_levels), (b"LLPK", 1, 16000, 3))
+        for i, level in enumerate(directory["levels"]):
+            self.assertEqual(struct.unpack_from("<III", data, 12 + 12 * i),
+                             (level["samples_per_peak"], level["count"], level["offset"]))
+        coarse = directory["levels"][-1]
+        pairs = np.frombuffer(data, dtype=np.int8, count=2 * coarse["count"], offset=coarse["offset"])
+        self.assertEqual(pairs[0::2].tolist(), (levels[-1][1] >> 8).tolist())
+        self.assertEqual(pairs[1::2].tolist(), (levels[-1][2] >> 8).tolist())
+        self.assertEqual(coarse["offset"] + 2 * coarse["count"], len(data))
+
+    def test_empty_wav(self):
+        write_wav(self.path("e.wav"), [])
+        self.assertEqual(waveform.compute_peaks(self.path("e.wav")), (16000, []))
+
+
+class PickLevelTests(SimpleTestCase):
+    levels = [{"samples_per_peak": 128, "count": 12500},
+              {"samples_per_peak": 512, "count": 3125},
+              {"samples_per_peak": 2048, "count": 782}]
+
+    def test_coarsest_with_enough_peaks(self):
+        level, first, last = waveform.pick_level(self.levels, 16000, 0, 100, 700)
+        self.assertEqual((level["samples_per_peak"], first, last), (2048, 0, 782))
+        level, _, _ = waveform.pick_level(self.levels, 16000, 0, 100, 1000)
+        self.assertEqual(level["samples_per_peak"], 512)
+
+    def test_short_span_uses_finest(self):
+        level, first, last = waveform.pick_level(self.levels, 16000, 10, 11, 4000)
+        self.assertEqual((level["samples_per_peak"], first, last), (128, 1250, 1375))
+
+    def test_indexes_are_clamped(self):
+        _, first, last = waveform.pick_level(self.levels, 16000, 500, 600, 10)
+        self.assertEqual((first, last), (782, 782))
+        _, first, last = waveform.pick_level(self.levels, 16000, 5, 1, 10)
+        self.assertEqual(first, last)
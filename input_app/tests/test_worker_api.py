@@ -0,0 +1,75 @@
+from unittest import mock
+
+from asgiref.sync import iscoroutinefunction
+from django.test import SimpleTestCase, TestCase
+
+from input_app import views, worker_api
+from input_app.models import TranscriptionJob
+
+AUTH = {"Authorization": "Bearer super-secret-token"}
+
+
+async def signed(key, minutes=15, content_type=None):
+    return f"https://signed.example/{key}"
+
+
+class WorkerAuthTests(SimpleTestCase):
+    def test_keeps_async_views_async(self):
+        self.assertTrue(iscoroutinefunction(worker_api.next_job))
+        self.assertTrue(iscoroutinefunction(worker_api.complete))
+        self.assertFalse(iscoroutinefunction(worker_api.ping))
+
+    async def test_async_path_rejects_bad_tokens(self):
+        for headers in ({}, {"Authorization": "Bearer wrong"}):
+            response = await self.async_client.post("/api/worker/next", headers=headers)
+            self.assertEqual(response.status_code, 401)
+
+
+@mock.patch.object(worker_api, "asigned_put_url", signed)
+@mock.patch.object(worker_api, "asigned_get_url", signed)
+class WorkerApiTests(TestCase):
+    def make_job(self, status="awaiting_transcription", **fields):
+        return TranscriptionJob.objects.create(
+            youtube_url="https://youtu.be/x", status=status, wav_audio="jobs/1/audio_16k.wav", **fields)
+
+    async def test_next_job_claims_the_oldest(self):
+        self.assertEqual((await self.async_client.post("/api/worker/next", headers=AUTH)).status_code, 204)
+
+        job = await TranscriptionJob.objects.acreate(
+            youtube_url="https://youtu.be/x", status="awaiting_transcription", wav_audio="jobs/1/audio_16k.wav")
+        response = await self.async_client.post("/api/worker/next", headers=AUTH)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["job_uuid"], str(job.job_uuid))
+        self.assertEqual(data["audio_wav_get_url"], "https://signed.example/jobs/1/audio_16k.wav")
+        self.assertEqual(data["transcript_vtt_put_url"], "https://signed.example/jobs/1/transcript.vtt")
+        await job.arefresh_from_db()
+        self.assertEqual(job.status, "transcribing")
+
+    @mock.patch.object(worker_api.build_exports, "delay")
+    @mock.patch.object(worker_api.build_playback, "delay")
+    def test_complete_marks_ready_and_rebuilds_derived_files(self, playback_delay, exports_delay):
+        job = self.make_job("transcribing", checkpoints={"wav_stored": {}, "playback": {}, "exports": {}})
+        response = self.client.post("/api/worker/complete", {"job_uuid": str(job.job_uuid), "language": "en"},
+                                    content_type="application/json", headers=AUTH)
+        self.assertEqual(response.status_code, 200)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.language, job.transcript_vtt.name),
+                         ("ready", "en", "jobs/1/transcript.vtt"))
+        self.assertEqual(set(job.checkpoints), {"wav_stored"})
+        playback_delay.assert_called_once_with(job.id)
+        exports_delay.assert_called_once_with(job.id)
+
+    def test_job_ready_signs_every_artifact(self):
+        job = self.make_job("ready", source_audio="jobs/1/source.mp3", transcript_vtt="jobs/1/transcript.vtt")
+
+        async def vtt_text(key):
+            return "WEBVTT\n\n00:00.000 --> 00:01.000\nHello\n"
+
+        with mock.patch.object(views, "asigned_get_url", signed), mock.patch.object(views, "avtt_text", vtt_text):
+            response = self.client.get(f"/jobs/{job.job_uuid}/view/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["wav_url"], "https://signed.example/jobs/1/audio_16k.wav")
+        self.assertEqual(response.context["mp3_url"], "https://signed.example/jobs/1/source.mp3")
+        self.assertIsNone(response.context["json_url"])
+        self.assertIn("Hello", response.context["vtt_txt"])
@@ -0,0 +1,174 @@
+import gzip
+import json
+import re
+from contextlib import ExitStack, closing
+from typing import Dict, Iterable, Iterator, NamedTuple, Optional
+
+try:  # optional: precompressed .br variants are skipped without it
+    import brotli
+except ImportError:
+    brotli = None
+
+# Canonical transcript model + streaming exporters.
+#
+# Everything is a generator over Segment so a multi-hour transcript is never
+# held in memory: parse (VTT lines) -> filter/pair -> render (str chunks) ->
+# encode (byte chunks) -> HTTP response or compressed file.
+
+
+class Segment(NamedTuple):
+    index: int          # 1-based cue number
+    start: float        # seconds
+    end: float          # seconds
+    text: str
+    translation: str = ""  # bilingual layouts only
+
+
+# ---- parsing ---------------------------------------------------------
+
+_VTT_TS = re.compile(r"(?:(\d+):)?(\d{2}):(\d{2})[.,](\d{3})")
+
+def _seconds(ts: str) -> float:
+    h, m, s, ms = _VTT_TS.match(ts.strip()).groups()
+    return int(h or 0) * 3600 + int(m) * 60 + int(s) + int(ms) / 1000
+
+def iter_vtt_segments(lines: Iterable[str]) -> Iterator[Segment]:
+    """Parse WebVTT line by line (a file object works), yielding one Segment per cue."""
+    index, timing, text = 0, None, []
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if not line.strip():
+            if timing:
+                index += 1
+                yield Segment(index, timing[0], timing[1], "\n".join(text))
+            timing, text = None, []
+        elif "-->" in line:
+            start, end = line.split("-->", 1)
+            timing, text = (_seconds(start), _seconds(end.split()[0])), []
+        elif timing:
+            text.append(line)
+    if timing:
+        yield Segment(index + 1, timing[0], timing[1], "\n".join(text))
+
+
+# ---- transforms --------------------------------------------------------
+
+def slice_segments(segments: Iterable[Segment], start: Optional[float] = None,
+                   end: Optional[float] = None) -> Iterator[Segment]:
+    """Segments overlapping [start, end). Stops reading once past `end`."""
+    for seg in segments:
+        if end is not None and seg.start >= end:
+            break
+        if start is not None and seg.end <= start:
+            continue
+        yield seg
+
+def pair_segments(primary: Iterable[Segment], secondary: Iterable[Segment]) -> Iterator[Segment]:
+    """
+    Bilingual merge: attach every secondary cue whose midpoint falls inside a
+    primary cue as its translation. Both inputs are time-ordered, so this is a
+    single streaming pass with one cue of lookahead.
+    """
+    secondary = iter(secondary)
+    pending = next(secondary, None)
+    for seg in primary:
+        texts = []
+        while pending is not None and (pending.start + pending.end) / 2 < seg.end:
+            if (pending.start + pending.end) / 2 >= seg.start:
+                texts.append(pending.text)
+            pending = next(secondary, None)
+        yield seg._replace(translation="\n".join(texts))
+
+
+# ---- renderers (generators of str) ----------------------------------------
+
+def _clock(seconds: float, sep: str) -> str:
+    ms = int(round(seconds * 1000))
+    h, ms = divmod(ms, 3_600_000)
+    m, ms = divmod(ms, 60_000)
+    s, ms = divmod(ms, 1000)
+    return f"{h:02d}:{m:02d}:{s:02d}{sep}{ms:03d}"
+
+def _cue_text(seg: Segment) -> str:
+    return f"{seg.text}\n{seg.translation}" if seg.translation else seg.text
+
+def render_srt(segments: Iterable[Segment]) -> Iterator[str]:
+    for n, seg in enumerate(segments, 1):
+        yield f"{n}\n{_clock(seg.start, ',')} --> {_clock(seg.end, ',')}\n{_cue_text(seg)}\n\n"
+
+def render_vtt(segments: Iterable[Segment]) -> Iterator[str]:
+    yield "WEBVTT\n\n"
+    for seg in segments:
+        yield f"{seg.index}\n{_clock(seg.start, '.')} --> {_clock(seg.end, '.')}\n{_cue_text(seg)}\n\n"
+
+def render_txt(segments: Iterable[Segment]) -> Iterator[str]:
+    for seg in segments:
+        yield f"{seg.text}\n"
+        if seg.translation:
+            yield f"    {seg.translation}\n"
+
+def render_json(segments: Iterable[Segment]) -> Iterator[str]:
+    yield '{"segments": ['
+    for n, seg in enumerate(segments):
+        item = {"index": seg.index, "start": seg.start, "end": seg.end, "text": seg.text}
+        if seg.translation:
+            item["translation"] = seg.translation
+        yield ("," if n else "") + "\n" + json.dumps(item, ensure_ascii=False)
+    yield "\n]}\n"
+
+# fmt -> (renderer, content type)
+FORMATS = {
+    "srt": (render_srt, "application/x-subrip; charset=utf-8"),
+    "vtt": (render_vtt, "text/vtt; charset=utf-8"),
+    "txt": (render_txt, "text/plain; charset=utf-8"),
+    "json": (render_json, "application/json"),
+}
+
+
+# ---- encoding -----------------------------------------------------------
+
+def encode_chunks(parts: Iterable[str], chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+    """UTF-8 encode and coalesce small strings into ~chunk_size byte chunks."""
+    buf, size = [], 0
+    for part in parts:
+        data = part.encode("utf-8")
+        buf.append(data)
+        size += len(data)
+        if size >= chunk_size:
+            yield b"".join(buf)
+            buf, size = [], 0
+    if buf:
+        yield b"".join(buf)
+
+def compressed_encodings():
+    return ("br", "gzip") if brotli else ("gzip",)
+
+class _BrotliWriter:
+    def __init__(self, path: str):
+        self._file = open(path, "wb")
+        self._compressor = brotli.Compressor(quality=11)
+
+    def write(self, data: bytes):
+        self._file.write(self._compressor.process(data))
+
+    def close(self):
+        try:
+            self._file.write(self._compressor.finish())
+        finally:
+            self._file.close()
+
+def _open_compressed(path: str, encoding: str):
+    if encoding == "gzip":
+        return gzip.open(path, "wb", compresslevel=9)
+    if encoding == "br":
+        return _BrotliWriter(path)
+    raise ValueError(f"unsupported encoding {encoding!r}")
+
+def write_compressed(chunks: Iterable[bytes], targets: Dict[str, str]):
+    """Stream chunks into several compressed files in one pass: targets = {encoding: path}."""
+    with ExitStack() as stack:
+        files = [stack.enter_context(closing(_open_compressed(path, encoding)))
+                 for encoding, path in targets.items()]
+        for chunk in chunks:
+            for f in files:
+                f.write(chunk)
@@ -5,11 +5,16 @@ from . import worker_api
 urlpatterns = [
     path("", views.upload_page, name="upload_page"),         # GET
     path("submit/", views.submit_url, name="submit_url"),    # POST
+    path("library/", views.library, name="library"),
     path("jobs/<uuid:job_uuid>/", views.job_detail, name="job_detail"),
     path("jobs/<uuid:job_uuid>/status", views.job_status, name="job_status"),
     path("api/worker/ping", worker_api.ping, name="worker_ping"),
     path("api/worker/next", worker_api.next_job, name="worker_next"),
     path("api/worker/complete", worker_api.complete, name="worker_complete"),
     path("api/worker/heartbeat", views.worker_heartbeat, name="worker_heartbeat"),
-    path("jobs/<uuid:job_uuid>/view/", views.job_ready, name="job_ready")
+    path("jobs/<uuid:job_uuid>/view/", views.job_ready, name="job_ready"),
+    path("jobs/<uuid:job_uuid>/playback.m3u8", views.playback_playlist, name="playback_playlist"),
+    path("jobs/<uuid:job_uuid>/clips/<int:index>", views.sentence_clip, name="sentence_clip"),
+    path("jobs/<uuid:job_uuid>/peaks", views.waveform_peaks, name="waveform_peaks"),
+    path("jobs/<uuid:job_uuid>/export.<str:fmt>", views.export_transcript, name="export_transcript"),
 ]
\ No newline at end of file
@@ -2,13 +2,27 @@ from django.shortcuts import render
 from django.conf import settings
 from django.shortcuts import render, redirect, get_object_or_404
 from django.views.decorators.http import require_http_methods
+from django.contrib.auth.decorators import login_required
 from .models import TranscriptionJob
+from .events import record_event, latest_event, alatest_event
+from . import admission
+from .pagination import CURSOR_VAR, keyset_page
 from django.http import HttpResponse
 from input_app.tasks import prepare_audio
-from django.http import JsonResponse, HttpResponseBadRequest
+from django.http import JsonResponse, HttpResponseBadRequest, Http404, StreamingHttpResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils.cache import patch_vary_headers
 from django.views.decorators.csrf import csrf_exempt
 import json
-from .gcs_utils import signed_get_url, vtt_text
+import asyncio
+import uuid
+from asgiref.sync import sync_to_async
+from .gcs_utils import asigned_get_url, avtt_text, aobject_text, aobject_bytes, open_object
+from .transcripts import FORMATS, iter_vtt_segments, slice_segments, pair_segments, encode_chunks
+from .waveform import pick_level, reduce_peaks
+import numpy as np
 
 
 # input_app/views.py
@@ -24,10 +38,34 @@ def upload_page(request):
 @require_http_methods(["POST"])
 def submit_url(request):
     url = request.POST.get("youtube_url")
+
+    # A full waiting room turns everyone away; checked first so the 503
+    # doesn't also cost the owner a token
+    waiting = TranscriptionJob.objects.filter(status="waiting")[:settings.ADMISSION_MAX_WAITING].count()
+    if waiting >= settings.ADMISSION_MAX_WAITING:
+        response = HttpResponse("We're at capacity, please retry later.", status=503)
+        response["Retry-After"] = str(settings.ADMISSION_QUEUE_RETRY_SEC)
+        return response
+
+    # Per-owner bucket: a scripted client gets a 429, no row, no task
+    decision = admission.charge_owner(admission.owner_key_for(request))
+    if not decision.admitted:
+        response = HttpResponse("Too many submissions, please retry later.", status=429)
+        response["Retry-After"] = str(decision.retry_after)
+        return response
+
+    # Then global rate + queue depth: admit now, or park the job in the waiting room.
+    # While anyone is already waiting, new jobs go in behind them rather than
+    # racing them for refilled tokens: admit_waiting_jobs drains it oldest first.
+    admitted, retry_after = False, settings.ADMISSION_QUEUE_RETRY_SEC
+    if not waiting:
+        decision = admission.admit_global()
+        admitted, retry_after = decision.admitted, decision.retry_after
+
     job = TranscriptionJob.objects.create(
         youtube_url=url,
         owner=request.user if request.user.is_authenticated else None,
-        status="queued",
+        status="queued" if admitted else "waiting",
     )
     # try:
     #     media_dir = settings.MEDIA_ROOT  # dev: useu MEDIA_ROOT as scratch
@@ -36,26 +74,73 @@ def submit_url(request):
     #     job.status = "failed"
     #     job.error_message = str(e)
     #     job.save()
-    prepare_audio.delay(job.id)
-    return redirect("job_detail", job_uuid=str(job.job_uuid))
+    if admitted:
+        prepare_audio.delay(job.id)
+        return redirect("job_detail", job_uuid=str(job.job_uuid))
+
+    # admit_waiting_jobs (celery beat) dispatches it once there is room
+    record_event(job.id, "waiting", 0, "In the waiting room…", buffered=False)
+    response = redirect("job_detail", job_uuid=str(job.job_uuid))
+    response["Retry-After"] = str(retry_after)
+    return response
+
+@login_required
+def library(request):
+    """The learner's own jobs, newest first, one keyset page at a time (no COUNT)."""
+    jobs = (TranscriptionJob.objects
+            .filter(owner=request.user)
+            .only("id", "job_uuid", "title", "status", "language", "segment_count",
+                  "duration_sec", "created_at"))
+    try:
+        page, next_cursor = keyset_page(jobs, request.GET.get(CURSOR_VAR), 25)
+    except ValueError:
+        return HttpResponseBadRequest("bad cursor")
+    return render(request, "input_app/library.html", {
+        "jobs": page,
+        "next_cursor": next_cursor,
+        "is_first_page": not request.GET.get(CURSOR_VAR),
+    })
 
 def job_detail(request, job_uuid):
     job = get_object_or_404(TranscriptionJob, job_uuid=job_uuid)
+    event = latest_event(job.id)
+    if event:
+        # progress lives on the event timeline; show its latest state
+        job.step, job.percent, job.message = event.stage, event.percent, event.message
     return render(request, "input_app/job_detail.html", {"job": job})
 
+async def aget_job_or_404(**lookup):
+    # async counterpart of get_object_or_404 (Django 4.2 has no async shortcut)
+    try:
+        return await TranscriptionJob.objects.aget(**lookup)
+    except TranscriptionJob.DoesNotExist:
+        raise Http404("No TranscriptionJob matches the given query.")
+
 # input_app/views.py
-def job_status(request, job_uuid):
-    job = get_object_or_404(TranscriptionJob, job_uuid=job_uuid)
-    return JsonResponse({
+async def job_status(request, job_uuid):
+    job = await aget_job_or_404(job_uuid=job_uuid)
+    # latest progress comes from the (job, ts) index; the job row only holds the status
+    event = await alatest_event(job.id)
+    step, percent, message, updated_at = (
+        (event.stage, event.percent, event.message, event.ts) if event
+        else (job.step, job.percent, job.message, job.updated_at)
+    )
+    data = {
         "status": job.status or "",
-        "step": job.step or "",
-        "percent": job.percent or 0,
-        "message": job.message or "",
-        "updated_at": job.updated_at.isoformat() if job.updated_at else None,
+        "step": step or "",
+        "percent": percent or 0,
+        "message": message or "",
+        "updated_at": updated_at.isoformat() if updated_at else None,
         "title": job.title or "",
         "youtube_id": job.youtube_id or "",
         "duration_sec": float(job.duration_sec or 0),
-    })
+    }
+    if job.status == "waiting":
+        # 1-based place in the waiting room (admitted oldest first)
+        ahead = await TranscriptionJob.objects.filter(status="waiting", created_at__lt=job.created_at).acount()
+        data["queue_position"] = ahead + 1
+        data["message"] = f"In the waiting room (position {ahead + 1})…"
+    return JsonResponse(data)
 
 @csrf_exempt
 def worker_heartbeat(request):
@@ -68,26 +153,38 @@ def worker_heartbeat(request):
     percent  = data.get("percent", 70)
     message  = data.get("message", "Transcribing…")
     try:
-        job = TranscriptionJob.objects.get(job_uuid=job_uuid)
+        job = TranscriptionJob.objects.only("id", "status").get(job_uuid=job_uuid)
     except TranscriptionJob.DoesNotExist:
         return HttpResponseBadRequest("unknown job")
     # keep transcribing percent below 100; let /complete set final ready
-    job.status = "transcribing"
-    job.step   = "transcribing"
-    job.percent = max(job.percent or 0, min(99, int(percent)))
-    job.message = message[:255]
-    job.save(update_fields=["status","step","percent","message","updated_at"])
+    last = latest_event(job.id)
+    percent = max(last.percent if last else 0, min(99, int(percent)))
+    if job.status != "transcribing":
+        # real transition: touch the job row once, not on every heartbeat
+        job.status = "transcribing"
+        job.step   = "transcribing"
+        job.save(update_fields=["status","step","updated_at"])
+    record_event(job.id, "transcribing", percent, message, buffered=False)
     return JsonResponse({"ok": True})
 
 
-def job_ready(request, job_uuid):
-    job = get_object_or_404(TranscriptionJob, job_uuid=job_uuid)
-    json_url = signed_get_url(job.transcript_json.name) if job.transcript_json else None
-    vtt_url  = signed_get_url(job.transcript_vtt.name)  if job.transcript_vtt  else None
-    mp3_url  = signed_get_url(job.source_audio.name)    if job.source_audio    else None
-    wav_url  = signed_get_url(job.wav_audio.name)       if job.wav_audio       else None
-    
-    vtt_txt = vtt_text(job.transcript_vtt.name) if job.transcript_vtt  else None
+async def job_ready(request, job_uuid):
+    job = await aget_job_or_404(job_uuid=job_uuid)
+
+    async def signed(field):
+        return await asigned_get_url(field.name) if field else None
+
+    async def transcript_text():
+        return await avtt_text(job.transcript_vtt.name) if job.transcript_vtt else None
+
+    # signing + VTT download are independent storage calls: run them together
+    json_url, vtt_url, mp3_url, wav_url, vtt_txt = await asyncio.gather(
+        signed(job.transcript_json),
+        signed(job.transcript_vtt),
+        signed(job.source_audio),
+        signed(job.wav_audio),
+        transcript_text(),
+    )
 
     return render(request, "input_app/job_ready.html", {
         "job": job,
@@ -96,5 +193,154 @@ def job_ready(request, job_uuid):
         "mp3_url": mp3_url,
         "wav_url": wav_url,
         "vtt_txt": vtt_txt,
+        "playback_url": reverse("playback_playlist", args=[job.job_uuid]) if job.playback_playlist else None,
+        "clip_count": job.clip_count or 0,
+        "peaks_url": reverse("waveform_peaks", args=[job.job_uuid]) if job.waveform_peaks else None,
+    })
+    # return render(request, "input_app/job_ready.html", {"job": job})
+
+
+async def playback_playlist(request, job_uuid):
+    """HLS playlist with the (single, byte-ranged) stream URI swapped for a signed URL."""
+    job = await aget_job_or_404(job_uuid=job_uuid)
+    if not job.playback_playlist:
+        raise Http404("No playback rendition yet.")
+
+    cache_key = f"playback-m3u8:{job.job_uuid}:{job.playback_playlist.name}"
+    body = await cache.aget(cache_key)
+    if body is None:
+        stream_key = job.checkpoints["playback"]["stream_key"]
+        playlist, stream_url = await asyncio.gather(
+            aobject_text(job.playback_playlist.name),
+            asigned_get_url(stream_key, minutes=settings.PLAYBACK_URL_MINUTES),
+        )
+        stream_name = stream_key.rsplit("/", 1)[1]
+        body = "\n".join(stream_url if line.strip() == stream_name else line
+                         for line in playlist.splitlines()) + "\n"
+        # keep well inside the signed URL lifetime
+        await cache.aset(cache_key, body, timeout=(settings.PLAYBACK_URL_MINUTES - 10) * 60)
+    return HttpResponse(body, content_type="application/vnd.apple.mpegurl")
+
+
+async def sentence_clip(request, job_uuid, index):
+    """Redirect to the pre-cut clip for transcript cue `index` (a few KB)."""
+    job = await aget_job_or_404(job_uuid=job_uuid)
+    if not job.clip_count or not 0 <= index < job.clip_count:
+        raise Http404("No such clip.")
+    clips_prefix = job.checkpoints["playback"]["clips_prefix"]
+    return redirect(await asigned_get_url(f"{clips_prefix}/clip_{index:05d}.aac",
+                                          minutes=settings.PLAYBACK_URL_MINUTES))
+
+
+async def waveform_peaks(request, job_uuid):
+    """
+    Min/max peaks for [start, end) seconds at roughly `px` points, read with a
+    single ranged GET from the precomputed pyramid. ?px=1200&start=0&end=60
+    """
+    job = await aget_job_or_404(job_uuid=job_uuid)
+    if not job.waveform_peaks:
+        raise Http404("No waveform yet.")
+
+    meta = job.checkpoints["waveform_peaks"]
+    levels, sample_rate = meta["levels"], meta["sample_rate"]
+    if not levels:
+        return JsonResponse({"sample_rate": sample_rate, "samples_per_peak": 0, "start_sec": 0.0,
+                             "duration_sec": 0.0, "peaks": []})
+    duration = levels[0]["count"] * levels[0]["samples_per_peak"] / sample_rate
+    try:
+        px = max(1, min(4000, int(request.GET.get("px", 1000))))
+        start = max(0.0, float(request.GET.get("start", 0)))
+        end = min(duration, float(request.GET.get("end", duration)))
+    except ValueError:
+        return HttpResponseBadRequest("px, start and end must be numbers")
+
+    level, first, last = pick_level(levels, sample_rate, start, end, px)
+    samples_per_peak, peaks = level["samples_per_peak"], []
+    if last > first:
+        raw = await aobject_bytes(job.waveform_peaks.name,
+                                  start=level["offset"] + 2 * first,
+                                  end=level["offset"] + 2 * last - 1)
+        pairs = np.frombuffer(raw, dtype=np.int8)
+        mins, maxs = pairs[0::2], pairs[1::2]
+        factor = len(mins) // px
+        if factor > 1:
+            # the stored level can hold up to LEVEL_FACTOR x px points; trim to ~px
+            mins, maxs = reduce_peaks(mins, maxs, factor)
+            samples_per_peak *= factor
+        pairs = np.empty(2 * len(mins), dtype=np.int8)
+        pairs[0::2], pairs[1::2] = mins, maxs
+        peaks = pairs.tolist()
+    return JsonResponse({
+        "sample_rate": sample_rate,
+        "samples_per_peak": samples_per_peak,
+        "start_sec": first * level["samples_per_peak"] / sample_rate,  # time of peaks[0]
+        "duration_sec": duration,
+        "peaks": peaks,  # interleaved min, max (int8, full scale = 128)
     })
-    # return render(request, "input_app/job_ready.html", {"job": job})
\ No newline at end of file
+
+
+def _job_segments(job, start=None, end=None):
+    # streamed straight from storage; the reader closes when the generator does
+    with open_object(job.transcript_vtt.name) as lines:
+        yield from slice_segments(iter_vtt_segments(lines), start, end)
+
+def _streaming_body(request, chunks):
+    """
+    Under ASGI Django would buffer a sync iterator into a list before sending,
+    so hand it an async iterator that pulls one chunk at a time from a thread.
+    """
+    if not isinstance(request, ASGIRequest):
+        return chunks
+
+    async def body():
+        pull = sync_to_async(lambda: next(chunks, None), thread_sensitive=False)
+        try:
+            while (chunk := await pull()) is not None:
+                yield chunk
+        finally:
+            await sync_to_async(chunks.close, thread_sensitive=False)()
+    return body()
+
+async def export_transcript(request, job_uuid, fmt):
+    """
+    /jobs/<uuid>/export.<srt|vtt|txt|json>[?start=&end=][&with=<uuid>]
+    start/end cut a time slice; `with` pairs another job's transcript line by line
+    (bilingual layout). Plain exports redirect to a precompressed copy when the
+    client accepts it; everything else is rendered as a stream.
+    """
+    if fmt not in FORMATS:
+        raise Http404("Unknown export format.")
+    job = await aget_job_or_404(job_uuid=job_uuid)
+    if not job.transcript_vtt:
+        raise Http404("No transcript yet.")
+
+    try:
+        start = float(request.GET["start"]) if request.GET.get("start") else None
+        end = float(request.GET["end"]) if request.GET.get("end") else None
+        pair_uuid = uuid.UUID(request.GET["with"]) if request.GET.get("with") else None
+    except ValueError:
+        return HttpResponseBadRequest("start/end must be seconds, with must be a job id")
+
+    if start is None and end is None and pair_uuid is None:
+        variants = job.checkpoints.get("exports", {}).get("variants", {}).get(fmt, {})
+        accepted = {token.split(";")[0].strip() for token in request.headers.get("Accept-Encoding", "").split(",")}
+        for encoding in ("br", "gzip"):
+            if encoding in variants and encoding in accepted:
+                response = redirect(await asigned_get_url(variants[encoding]))
+                patch_vary_headers(response, ["Accept-Encoding"])
+                return response
+
+    segments = _job_segments(job, start, end)
+    if pair_uuid is not None:
+        other = await aget_job_or_404(job_uuid=pair_uuid)
+        if not other.transcript_vtt:
+            raise Http404("Paired job has no transcript yet.")
+        segments = pair_segments(segments, _job_segments(other, start, end))
+
+    render, content_type = FORMATS[fmt]
+    response = StreamingHttpResponse(_streaming_body(request, encode_chunks(render(segments))),
+                                     content_type=content_type)
+    response["Content-Disposition"] = f'attachment; filename="{job.youtube_id or job.job_uuid}.{fmt}"'
+    # a plain export may be a redirect to a compressed copy instead, depending on Accept-Encoding
+    patch_vary_headers(response, ["Accept-Encoding"])
+    return response
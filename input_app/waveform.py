@@ -0,0 +1,123 @@
+import math
+import struct
+import numpy as np
+
+# Multi-resolution min/max peaks for the learner audio player.
+#
+# File layout ("waveform.peaks", little-endian):
+#   header:  b"LLPK" | u16 version | u32 sample_rate | u16 n_levels
+#   levels:  n_levels x (u32 samples_per_peak | u32 count | u32 offset)
+#   data:    per level, `count` interleaved int8 (min, max) pairs at `offset`
+# Values are the 16-bit PCM peaks scaled down to int8 (x >> 8).
+
+MAGIC = b"LLPK"
+VERSION = 1
+BASE_SAMPLES_PER_PEAK = 128   # 125 peaks/s at 16 kHz: enough for a few seconds per screen
+LEVEL_FACTOR = 4              # each coarser level merges 4 peaks of the one below
+MIN_LEVEL_PEAKS = 256         # stop once a level would be shorter than this
+
+_HEADER = struct.Struct("<4sHIH")
+_LEVEL = struct.Struct("<III")
+
+
+def wav_pcm16_data(path):
+    """(sample_rate, data_offset, n_samples) for a mono 16-bit PCM WAV."""
+    with open(path, "rb") as f:
+        riff, _, wave = struct.unpack("<4sI4s", f.read(12))
+        if riff != b"RIFF" or wave != b"WAVE":
+            raise ValueError(f"{path} is not a WAV file")
+        sample_rate = None
+        while True:
+            chunk = f.read(8)
+            if len(chunk) < 8:
+                raise ValueError(f"{path} has no data chunk")
+            chunk_id, size = struct.unpack("<4sI", chunk)
+            if chunk_id == b"fmt ":
+                fmt = f.read(size)
+                audio_format, channels, sample_rate = struct.unpack("<HHI", fmt[:8])
+                bits = struct.unpack("<H", fmt[14:16])[0]
+                if audio_format != 1 or channels != 1 or bits != 16:
+                    raise ValueError("expected mono 16-bit PCM")
+                f.seek(size % 2, 1)
+            elif chunk_id == b"data":
+                offset = f.tell()
+                # ffmpeg writes 0xFFFFFFFF / 0 sizes when streaming; trust the file length then
+                file_size = f.seek(0, 2)
+                if size in (0, 0xFFFFFFFF) or offset + size > file_size:
+                    size = file_size - offset
+                return sample_rate, offset, size // 2
+            else:
+                f.seek(size + size % 2, 1)
+
+
+def reduce_peaks(mins, maxs, factor):
+    """Merge every `factor` consecutive (min, max) pairs, padding the tail."""
+    pad = -len(mins) % factor
+    if pad:
+        mins = np.concatenate([mins, np.repeat(mins[-1:], pad)])
+        maxs = np.concatenate([maxs, np.repeat(maxs[-1:], pad)])
+    return mins.reshape(-1, factor).min(axis=1), maxs.reshape(-1, factor).max(axis=1)
+
+
+def compute_peaks(wav_path):
+    """
+    Returns (sample_rate, [(samples_per_peak, mins, maxs), ...]) finest first.
+    The WAV is memory-mapped; only the int16 peak arrays live in memory.
+    """
+    sample_rate, offset, n_samples = wav_pcm16_data(wav_path)
+    if n_samples == 0:
+        return sample_rate, []
+    samples = np.memmap(wav_path, dtype="<i2", mode="r", offset=offset, shape=(n_samples,))
+
+    spp = BASE_SAMPLES_PER_PEAK
+    n_full = n_samples // spp * spp
+    blocks = samples[:n_full].reshape(-1, spp)
+    mins, maxs = blocks.min(axis=1), blocks.max(axis=1)
+    if n_full < n_samples:
+        tail = samples[n_full:]
+        mins = np.append(mins, tail.min())
+        maxs = np.append(maxs, tail.max())
+    del samples, blocks
+
+    levels = [(spp, mins, maxs)]
+    while len(mins) > MIN_LEVEL_PEAKS * LEVEL_FACTOR:
+        mins, maxs = reduce_peaks(mins, maxs, LEVEL_FACTOR)
+        spp *= LEVEL_FACTOR
+        levels.append((spp, mins, maxs))
+    return sample_rate, levels
+
+
+def write_peaks(path, sample_rate, levels):
+    """Write the binary artifact; returns the level directory for the job checkpoint."""
+    directory = []
+    offset = _HEADER.size + _LEVEL.size * len(levels)
+    for spp, mins, _ in levels:
+        directory.append({"samples_per_peak": spp, "count": len(mins), "offset": offset})
+        offset += 2 * len(mins)
+
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, sample_rate, len(levels)))
+        for level in directory:
+            f.write(_LEVEL.pack(level["samples_per_peak"], level["count"], level["offset"]))
+        for _, mins, maxs in levels:
+            pairs = np.empty(2 * len(mins), dtype=np.int8)
+            pairs[0::2] = mins >> 8
+            pairs[1::2] = maxs >> 8
+            f.write(pairs.tobytes())
+    return {"sample_rate": sample_rate, "levels": directory}
+
+
+def pick_level(levels, sample_rate, start_sec, end_sec, px):
+    """
+    Coarsest level that still has >= px peaks over [start_sec, end_sec).
+    Returns (level, first_index, last_index_exclusive).
+    """
+    span = max(0.0, end_sec - start_sec) * sample_rate
+    chosen = levels[0]
+    for level in levels:  # finest -> coarsest
+        if span / level["samples_per_peak"] >= px:
+            chosen = level
+    spp = chosen["samples_per_peak"]
+    first = min(chosen["count"], max(0, int(start_sec * sample_rate // spp)))
+    last = min(chosen["count"], max(first, math.ceil(end_sec * sample_rate / spp)))
+    return chosen, first, last
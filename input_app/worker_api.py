@@ -2,36 +2,50 @@ from django.http import JsonResponse
 from django.conf import settings
 from django.views.decorators.csrf import csrf_exempt
 import json
+import asyncio
+from functools import wraps
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
 from django.db import transaction
 from django.utils.timezone import now
 from .models import TranscriptionJob
-from .gcs_utils import signed_get_url, signed_put_url
+from .gcs_utils import asigned_get_url, asigned_put_url
+from .tasks import build_playback, build_exports
+from .services import STAGE_PLAYBACK, STAGE_EXPORTS
+from .events import record_event, arecord_event
 
 #decorator
+def _worker_authorized(request):
+    return request.headers.get("Authorization") == f"Bearer {settings.WORKER_API_TOKEN}"
+
 def require_worker_auth(view_func):
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def async_wrapper(request, *args, **kwargs):
+            if not _worker_authorized(request):
+                return JsonResponse({"error": "Unauthorized"}, status=401)
+            return await view_func(request, *args, **kwargs)
+        return async_wrapper
+
     def wrapper(request, *args, **kwargs):
-        auth_header = request.headers.get("Authorization")
-        expected = f"Bearer {settings.WORKER_API_TOKEN}"
-        if auth_header != expected:
+        if not _worker_authorized(request):
             return JsonResponse({"error": "Unauthorized"}, status=401)
         return view_func(request, *args, **kwargs)
     return wrapper
 
+def async_csrf_exempt(view_func):
+    # Django 4.2's csrf_exempt returns a plain sync wrapper; re-mark it so the
+    # handler still awaits the view instead of running it in a thread.
+    return markcoroutinefunction(csrf_exempt(view_func))
+
 @csrf_exempt
 @require_worker_auth
 def ping(request):
     return JsonResponse({"ok": True, "message": "Worker API is alive!"})
 
 
-@csrf_exempt
-@require_worker_auth
-def next_job(request):
-    if request.method != "POST":
-        return JsonResponse({"error": "Method not allowed"}, status=405)
-
-    # If you want, parse worker preferences here (model, language)
-    # prefs = json.loads(request.body or b"{}")
-
+@sync_to_async
+def _claim_next_job():
+    # select_for_update needs a transaction, which has no async API yet
     with transaction.atomic():
         job = (
             TranscriptionJob.objects
@@ -41,12 +55,28 @@ def next_job(request):
             .first()
         )
         if not job:
-            return JsonResponse({}, status=204)  # no content
+            return None
 
         # Mark as claimed
         job.status = "transcribing"
         job.updated_at = now()
         job.save(update_fields=["status", "updated_at"])
+        record_event(job.id, "transcribing", 65, "Claimed by GPU worker…", buffered=False)
+    return job
+
+
+@async_csrf_exempt
+@require_worker_auth
+async def next_job(request):
+    if request.method != "POST":
+        return JsonResponse({"error": "Method not allowed"}, status=405)
+
+    # If you want, parse worker preferences here (model, language)
+    # prefs = json.loads(request.body or b"{}")
+
+    job = await _claim_next_job()
+    if not job:
+        return JsonResponse({}, status=204)  # no content
 
     # Build object keys (we already stored FileFields; use their .name as the key)
     # If you saved to GCS via DEFAULT_FILE_STORAGE, FileField.name is the GCS object key.
@@ -56,10 +86,12 @@ def next_job(request):
     json_key = f"{base_prefix}/transcript.json"
     vtt_key  = f"{base_prefix}/transcript.vtt"
 
-    # Signed URLs
-    audio_wav_get_url = signed_get_url(wav_key, minutes=20)
-    transcript_json_put_url = signed_put_url(json_key, content_type="application/json", minutes=20)
-    transcript_vtt_put_url  = signed_put_url(vtt_key,  content_type="text/vtt",        minutes=20)
+    # Signed URLs (independent of each other, so sign them concurrently)
+    audio_wav_get_url, transcript_json_put_url, transcript_vtt_put_url = await asyncio.gather(
+        asigned_get_url(wav_key, minutes=20),
+        asigned_put_url(json_key, content_type="application/json", minutes=20),
+        asigned_put_url(vtt_key,  content_type="text/vtt",        minutes=20),
+    )
 
     # Return contract
     return JsonResponse({
@@ -80,9 +112,9 @@ def next_job(request):
     }, status=200)
 
 
-@csrf_exempt
+@async_csrf_exempt
 @require_worker_auth
-def complete(request):
+async def complete(request):
     if request.method != "POST":
         return JsonResponse({"error": "Method not allowed"}, status=405)
 
@@ -94,8 +126,7 @@ def complete(request):
     except Exception:
         return JsonResponse({"error": "Invalid JSON"}, status=400)
 
-    from .models import TranscriptionJob
-    job = TranscriptionJob.objects.filter(job_uuid=job_uuid).first()
+    job = await TranscriptionJob.objects.filter(job_uuid=job_uuid).afirst()
     if not job:
         return JsonResponse({"error": "Job not found"}, status=404)
 
@@ -114,8 +145,16 @@ def complete(request):
     if segment_count is not None: job.segment_count = segment_count
     job.status = "ready"
     job.updated_at = now()
-    job.save(update_fields=[
-        "transcript_json","transcript_vtt","language","segment_count","status","updated_at"
+    # playback clips and exports are cut from the transcript: rebuild them for this one
+    job.checkpoints = {stage: cp for stage, cp in (job.checkpoints or {}).items()
+                       if stage not in (STAGE_PLAYBACK, STAGE_EXPORTS)}
+    await job.asave(update_fields=[
+        "transcript_json","transcript_vtt","language","segment_count","status","updated_at","checkpoints"
     ])
+    await arecord_event(job.id, "ready", 100, "Transcript ready.")
+    # Player-friendly rendition and precompressed exports are built in the background;
+    # the page falls back to the WAV / live-rendered exports meanwhile
+    await sync_to_async(build_playback.delay)(job.id)
+    await sync_to_async(build_exports.delay)(job.id)
 
     return JsonResponse({"ok": True})
\ No newline at end of file